@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from core.cache import aget_token_version, get_token_version
+from core.models import User
+from .tokens import TOKEN_VERSION_CLAIM
+
+
+class ClaimsUser(TokenUser):
+    """
+    Usuário sem representação no banco, montado a partir das claims do token.
+    """
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    @cached_property
+    def is_active(self):
+        return self.token.get('is_active', True)
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Autenticação JWT sem consulta ao banco: ``request.user`` é um ClaimsUser.
+
+    O banco só é consultado pela verificação de revogação configurada em
+    JWT_REVOCATION_CHECK; no modo ``version`` a consulta passa por um cache
+    de curta duração.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if settings.JWT_REVOCATION_CHECK == 'version':
+            self.check_token_version(validated_token)
+        elif settings.JWT_REVOCATION_CHECK == 'db':
+            self.check_user_in_db(validated_token)
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        Versão assíncrona de ``authenticate``, para views que rodam no event
+        loop: a verificação de revogação usa o cache e o ORM assíncronos.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        user = super().get_user(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if settings.JWT_REVOCATION_CHECK == 'version':
+            await self.acheck_token_version(validated_token)
+        elif settings.JWT_REVOCATION_CHECK == 'db':
+            await self.acheck_user_in_db(validated_token)
+        return user, validated_token
+
+    def check_token_version(self, validated_token):
+        version = get_token_version(validated_token[jwt_settings.USER_ID_CLAIM])
+        if version is None or validated_token.get(TOKEN_VERSION_CLAIM) != version:
+            raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+
+    def check_user_in_db(self, validated_token):
+        user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        if not User.objects.filter(pk=user_id, is_active=True).exists():
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+    async def acheck_token_version(self, validated_token):
+        version = await aget_token_version(validated_token[jwt_settings.USER_ID_CLAIM])
+        if version is None or validated_token.get(TOKEN_VERSION_CLAIM) != version:
+            raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+
+    async def acheck_user_in_db(self, validated_token):
+        user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        if not await User.objects.filter(pk=user_id, is_active=True).aexists():
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
@@ -0,0 +1,100 @@
+import hashlib
+import json
+from collections import namedtuple
+from django.conf import settings
+from django.utils.http import parse_etags
+from rest_framework.utils.encoders import JSONEncoder
+from core.cache import user_cache, user_cache_key
+from core.models import User
+from .serializers import UserValuesSerializer
+
+UserEntry = namedtuple('UserEntry', ['data', 'etag'])
+
+
+def build_user_entry(row):
+    """
+    Serializa uma linha de ``User.objects.values()`` e calcula seu ETag.
+    """
+    data = dict(UserValuesSerializer(row).data)
+    payload = json.dumps(data, cls=JSONEncoder, sort_keys=True).encode()
+    etag = '"%s"' % hashlib.blake2b(payload, digest_size=16).hexdigest()
+    return UserEntry(data, etag)
+
+
+def get_user_entry(user_id):
+    """
+    Leitura com cache (read-through) da representação de um usuário.
+
+    Retorna ``None`` se o usuário não existir; ausências não são cacheadas.
+    """
+    cache = user_cache()
+    key = user_cache_key(user_id)
+    entry = cache.get(key)
+    if entry is None:
+        row = User.objects.values(*UserValuesSerializer.field_names).filter(pk=user_id).first()
+        if row is None:
+            return None
+        entry = build_user_entry(row)
+        cache.set(key, entry)
+    return entry
+
+
+def get_user_entries(user_ids=(), emails=()):
+    """
+    Leitura em lote de ``get_user_entry``, por ``user_id`` e por e-mail.
+
+    Os IDs passam primeiro pelo cache (``get_many``); os ausentes e os
+    e-mails são buscados com um ``IN`` por bloco de
+    USER_BATCH_LOOKUP['QUERY_CHUNK_SIZE'] e gravados no cache. Retorna dois
+    dicionários, ``{user_id: UserEntry}`` e ``{email: UserEntry}``, sem os
+    usuários inexistentes; e-mails são comparados em minúsculas.
+    """
+    cache = user_cache()
+    chunk_size = settings.USER_BATCH_LOOKUP['QUERY_CHUNK_SIZE']
+    queryset = User.objects.values(*UserValuesSerializer.field_names)
+
+    keys = {user_cache_key(user_id): user_id for user_id in user_ids}
+    by_id = {keys[key]: entry for key, entry in cache.get_many(keys).items()}
+    by_email = {}
+    fetched = {}
+
+    missing = [user_id for user_id in keys.values() if user_id not in by_id]
+    for start in range(0, len(missing), chunk_size):
+        for row in queryset.filter(pk__in=missing[start:start + chunk_size]):
+            by_id[row['user_id']] = fetched[user_cache_key(row['user_id'])] = build_user_entry(row)
+
+    emails = list(dict.fromkeys(email.lower() for email in emails))
+    for start in range(0, len(emails), chunk_size):
+        for row in queryset.filter(email__lower__in=emails[start:start + chunk_size]):
+            by_email[row['email'].lower()] = fetched[user_cache_key(row['user_id'])] = build_user_entry(row)
+
+    if fetched:
+        cache.set_many(fetched)
+    return by_id, by_email
+
+
+async def aget_user_entry(user_id):
+    """
+    Versão assíncrona de ``get_user_entry``.
+    """
+    cache = user_cache()
+    key = user_cache_key(user_id)
+    entry = await cache.aget(key)
+    if entry is None:
+        row = await User.objects.values(*UserValuesSerializer.field_names).filter(pk=user_id).afirst()
+        if row is None:
+            return None
+        entry = build_user_entry(row)
+        await cache.aset(key, entry)
+    return entry
+
+
+def etag_matches(request, etag):
+    """
+    Comparação fraca do ETag com o cabeçalho If-None-Match (RFC 9110).
+    """
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or any(tag.removeprefix('W/') == etag for tag in etags)
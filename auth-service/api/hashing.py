@@ -0,0 +1,84 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.exceptions import ImproperlyConfigured
+
+
+class HashPoolSaturated(Exception):
+    """
+    Levantada quando todos os workers e a fila do pool estão ocupados.
+    """
+
+
+class HashWorkerPool:
+    """
+    Executa a verificação de senhas fora do event loop.
+
+    A capacidade é limitada a ``max_workers + max_queue`` verificações em
+    andamento; acima disso o pool recusa o trabalho em vez de enfileirar
+    indefinidamente, para que a view possa responder 503 imediatamente.
+    """
+
+    def __init__(self, executor='thread', max_workers=4, max_queue=32):
+        if executor == 'thread':
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix='login-hash'
+            )
+        elif executor == 'process':
+            # Processos criados via spawn precisam inicializar o Django
+            # para que os hashers configurados estejam disponíveis.
+            self._executor = ProcessPoolExecutor(
+                max_workers=max_workers, initializer=django.setup
+            )
+        else:
+            raise ImproperlyConfigured(
+                f"LOGIN_HASH_POOL['EXECUTOR'] inválido: {executor!r}"
+            )
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    async def check_password(self, password, encoded):
+        """
+        Verifica ``password`` contra o hash ``encoded`` em um worker do pool.
+        """
+        return await self._submit(check_password, password, encoded)
+
+    async def make_password(self, password):
+        """
+        Calcula o hash de ``password`` com o hasher preferido em um worker
+        do pool.
+        """
+        return await self._submit(make_password, password)
+
+    async def _submit(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashPoolSaturated()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # A vaga só é liberada quando o hash termina, mesmo que a requisição
+        # tenha sido cancelada antes.
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache(maxsize=None)
+def get_hash_pool():
+    """
+    Retorna o pool de hashing do processo, criado a partir de LOGIN_HASH_POOL.
+    """
+    config = settings.LOGIN_HASH_POOL
+    return HashWorkerPool(
+        executor=config['EXECUTOR'],
+        max_workers=config['MAX_WORKERS'],
+        max_queue=config['MAX_QUEUE'],
+    )
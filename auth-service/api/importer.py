@@ -0,0 +1,150 @@
+import codecs
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from core.models import User
+from core.stats import admin_exists, count_created_users
+from .unknown_users import remember_emails
+from .serializers import EMAIL_IN_USE_MESSAGE, SINGLE_ADMIN_MESSAGE, BulkUserSerializer, unique_violation_errors
+
+
+def iter_csv(lines, encoding='utf-8'):
+    """
+    Lê linhas de CSV com cabeçalho (email, role, password) sob demanda.
+    """
+    yield from csv.DictReader(codecs.iterdecode(lines, encoding))
+
+
+def iter_ndjson(lines, encoding='utf-8'):
+    """
+    Lê um objeto JSON por linha sob demanda. Linhas que não são JSON válido
+    são repassadas como texto, para serem reportadas como erro da linha.
+    """
+    for line in codecs.iterdecode(lines, encoding):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class UserImporter:
+    """
+    Importa usuários em lote a partir de um iterável de linhas.
+
+    Cada lote de ``batch_size`` linhas é validado de uma vez: o formato de
+    cada linha pelo BulkUserSerializer, a unicidade dos e-mails com uma única
+    consulta ``IN`` e a regra de admin único com uma consulta por importação.
+    As senhas são processadas em paralelo e os usuários inseridos com
+    ``bulk_create`` em blocos de ``insert_chunk_size``. Linhas rejeitadas
+    são reportadas individualmente, sem interromper a importação.
+    """
+
+    def __init__(self, batch_size=None, insert_chunk_size=None, hash_workers=None):
+        config = settings.USER_IMPORT
+        self.batch_size = batch_size or config['BATCH_SIZE']
+        self.insert_chunk_size = insert_chunk_size or config['INSERT_CHUNK_SIZE']
+        self.hash_workers = hash_workers or config['HASH_WORKERS'] or os.cpu_count()
+        self.created = 0
+        self.errors = []
+        self._seen_emails = set()
+        self._admin_exists = None
+
+    def run(self, rows):
+        # Os hashers do Django (PBKDF2 via hashlib, Argon2, scrypt) liberam o
+        # GIL durante o cálculo, então threads usam todos os núcleos.
+        with ThreadPoolExecutor(max_workers=self.hash_workers) as executor:
+            self._executor = executor
+            for batch in batched(enumerate(rows, start=1), self.batch_size):
+                self.import_batch(batch)
+        return {'created': self.created, 'errors': self.errors}
+
+    def import_batch(self, batch):
+        valid = []
+        for line, row in batch:
+            data = self.validate_row(line, row)
+            if data is not None:
+                valid.append((line, data))
+
+        existing = set(
+            User.objects.filter(email__lower__in=[data['email'] for _, data in valid])
+            .values_list('email__lower', flat=True)
+            .order_by()
+        )
+        accepted = []
+        for line, data in valid:
+            error = self.check_constraints(data, existing)
+            if error:
+                self.add_error(line, data['email'], error)
+                continue
+            self._seen_emails.add(data['email'])
+            accepted.append((line, data))
+
+        passwords = self._executor.map(make_password, [data['password'] for _, data in accepted])
+        users = [
+            (line, User(email=data['email'], role=data['role'], password=encoded))
+            for (line, data), encoded in zip(accepted, passwords)
+        ]
+        self.insert(users)
+
+    def validate_row(self, line, row):
+        if not isinstance(row, dict):
+            self.add_error(line, None, {'non_field_errors': ["Linha inválida."]})
+            return None
+        serializer = BulkUserSerializer(data=row)
+        if not serializer.is_valid():
+            self.add_error(line, row.get('email'), serializer.errors)
+            return None
+        data = serializer.validated_data
+        data['email'] = User.objects.normalize_email(data['email'])
+        return data
+
+    def check_constraints(self, data, existing):
+        if data['email'] in existing or data['email'] in self._seen_emails:
+            return {'email': [EMAIL_IN_USE_MESSAGE]}
+        if data['role'] == 'admin':
+            if self._admin_exists is None:
+                self._admin_exists = admin_exists()
+            if self._admin_exists:
+                return {'role': [SINGLE_ADMIN_MESSAGE]}
+            self._admin_exists = True
+        return None
+
+    def insert(self, users):
+        for chunk in batched(users, self.insert_chunk_size):
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create([user for _, user in chunk])
+                    count_created_users(user for _, user in chunk)
+                self.created += len(chunk)
+                # bulk_create não dispara post_save
+                remember_emails(user.email for _, user in chunk)
+            except IntegrityError:
+                # Conflito com um cadastro concorrente: insere linha a linha
+                # para identificar qual registro falhou.
+                for line, user in chunk:
+                    self.insert_one(line, user)
+
+    def insert_one(self, line, user):
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+            self.created += 1
+        except IntegrityError:
+            self.add_error(line, user.email, unique_violation_errors(user.email))
+
+    def add_error(self, line, email, errors):
+        self.errors.append({'line': line, 'email': email, 'errors': errors})
@@ -0,0 +1,91 @@
+import hashlib
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from core.cache import get_token_versions
+from .cache import get_user_entries
+from .tokens import TOKEN_VERSION_CLAIM, AccessToken
+
+INACTIVE = {'active': False}
+
+
+def token_cache():
+    """
+    Cache dos tokens já verificados (TOKEN_CACHE_ALIAS).
+    """
+    return caches[settings.TOKEN_CACHE_ALIAS]
+
+
+def token_cache_key(raw_token):
+    return 'token:' + hashlib.sha256(raw_token.encode()).hexdigest()
+
+
+def verify_token(raw_token):
+    """
+    Verifica a assinatura e a validade do token de acesso.
+
+    As claims de tokens válidos ficam no cache até o ``exp``, então uma nova
+    verificação do mesmo token não repete a checagem de assinatura.
+    Retorna ``None`` para tokens inválidos ou expirados.
+    """
+    cache = token_cache()
+    key = token_cache_key(raw_token)
+    claims = cache.get(key)
+    if claims is None:
+        try:
+            token = AccessToken(raw_token)
+        except TokenError:
+            return None
+        claims = {
+            'user_id': token[jwt_settings.USER_ID_CLAIM],
+            'exp': token['exp'],
+            'ver': token.get(TOKEN_VERSION_CLAIM),
+        }
+        ttl = claims['exp'] - time.time()
+        if ttl > 0:
+            cache.set(key, claims, ttl)
+    if claims['exp'] <= time.time():
+        return None
+    return claims
+
+
+def introspect_token(raw_token):
+    """
+    Retorna o resultado da introspecção no formato da RFC 7662.
+    """
+    return introspect_tokens([raw_token])[0]
+
+
+def introspect_tokens(raw_tokens):
+    """
+    Introspecção em lote, na ordem recebida.
+
+    As versões de token e os usuários de todo o lote são resolvidos de uma
+    vez, com ``get_many`` nos caches e uma consulta ``IN`` para os ausentes,
+    em vez de duas consultas por token.
+    """
+    claims = [verify_token(raw_token) for raw_token in raw_tokens]
+    user_ids = list(dict.fromkeys(
+        uuid.UUID(str(token['user_id'])) for token in claims if token is not None
+    ))
+    versions = get_token_versions(user_ids)
+    current = [user_id for user_id in user_ids if user_id in versions]
+    entries, _ = get_user_entries(current)
+
+    results = []
+    for token in claims:
+        user_id = token and uuid.UUID(str(token['user_id']))
+        entry = entries.get(user_id)
+        if token is None or versions.get(user_id) != token['ver'] or entry is None:
+            results.append(INACTIVE)
+            continue
+        results.append({
+            'active': True,
+            'user_id': entry.data['user_id'],
+            'role': entry.data['role'],
+            'exp': token['exp'],
+        })
+    return results
@@ -0,0 +1,72 @@
+from functools import lru_cache
+from pathlib import Path
+import jwt
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework_simplejwt import settings as simplejwt_settings
+
+PUBLIC_KEY_SUFFIX = '.pub.pem'
+PRIVATE_KEY_SUFFIX = '.pem'
+
+
+class SigningKeySet:
+    """
+    Chaves assimétricas carregadas de arquivos PEM, identificadas pelo ``kid``.
+
+    No diretório de chaves, ``<kid>.pem`` contém uma chave privada e
+    ``<kid>.pub.pem`` apenas a chave pública de uma chave já aposentada. A
+    chave ``active_kid`` assina os novos tokens; todas as chaves públicas
+    continuam aceitas na verificação e publicadas no JWKS, o que permite a
+    rotação sem invalidar tokens emitidos com a chave anterior.
+    """
+
+    def __init__(self, algorithm, keys_dir, active_kid):
+        self.algorithm = algorithm
+        self.active_kid = active_kid
+        self.signing_key = None
+        self.verifying_keys = {}
+
+        for path in sorted(Path(keys_dir).glob('*' + PRIVATE_KEY_SUFFIX)):
+            data = path.read_bytes()
+            if path.name.endswith(PUBLIC_KEY_SUFFIX):
+                kid = path.name[:-len(PUBLIC_KEY_SUFFIX)]
+                self.verifying_keys[kid] = load_pem_public_key(data)
+                continue
+            kid = path.name[:-len(PRIVATE_KEY_SUFFIX)]
+            private_key = load_pem_private_key(data, password=None)
+            self.verifying_keys[kid] = private_key.public_key()
+            if kid == active_kid:
+                self.signing_key = private_key
+
+        if self.signing_key is None:
+            raise ImproperlyConfigured(
+                f"Chave privada '{active_kid}{PRIVATE_KEY_SUFFIX}' não encontrada em {keys_dir}."
+            )
+
+    def get_verifying_key(self, kid):
+        return self.verifying_keys.get(kid)
+
+    def jwks(self):
+        """
+        Retorna as chaves públicas no formato JWK Set (RFC 7517).
+        """
+        algorithm = jwt.PyJWS().get_algorithm_by_name(self.algorithm)
+        keys = []
+        for kid, public_key in self.verifying_keys.items():
+            jwk = algorithm.to_jwk(public_key, as_dict=True)
+            jwk.update({'kid': kid, 'use': 'sig', 'alg': self.algorithm})
+            keys.append(jwk)
+        return {'keys': keys}
+
+
+@lru_cache(maxsize=None)
+def get_signing_keys():
+    """
+    Conjunto de chaves configurado em JWT_SIGNING, ou ``None`` quando os
+    tokens são assinados com segredo compartilhado (HS*).
+    """
+    if simplejwt_settings.api_settings.ALGORITHM.startswith('HS'):
+        return None
+    config = settings.JWT_SIGNING
+    return SigningKeySet(simplejwt_settings.api_settings.ALGORITHM, config['KEYS_DIR'], config['ACTIVE_KID'])
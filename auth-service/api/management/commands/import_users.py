@@ -0,0 +1,49 @@
+import json
+import sys
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.utils.encoders import JSONEncoder
+from api.importer import UserImporter, iter_csv, iter_ndjson
+
+READERS = {'csv': iter_csv, 'ndjson': iter_ndjson}
+
+
+class Command(BaseCommand):
+    help = "Importa usuários de um arquivo CSV (email,role,password) ou NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Arquivo de entrada, ou '-' para ler da entrada padrão.")
+        parser.add_argument('--format', choices=READERS, help="Formato do arquivo (padrão: pela extensão).")
+        parser.add_argument('--batch-size', type=int, help="Linhas validadas por lote.")
+        parser.add_argument('--chunk-size', type=int, help="Linhas por INSERT.")
+        parser.add_argument('--workers', type=int, help="Threads de hashing de senha.")
+        parser.add_argument('--errors', help="Grava os erros por linha (NDJSON) neste arquivo.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or Path(path).suffix.lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError("Informe --format csv ou --format ndjson.")
+
+        importer = UserImporter(
+            batch_size=options['batch_size'],
+            insert_chunk_size=options['chunk_size'],
+            hash_workers=options['workers'],
+        )
+        if path == '-':
+            result = importer.run(READERS[file_format](sys.stdin.buffer))
+        else:
+            with open(path, 'rb') as stream:
+                result = importer.run(READERS[file_format](stream))
+
+        if options['errors']:
+            with open(options['errors'], 'w', encoding='utf-8') as report:
+                for error in result['errors']:
+                    report.write(json.dumps(error, cls=JSONEncoder, ensure_ascii=False) + '\n')
+        else:
+            for error in result['errors']:
+                self.stderr.write(json.dumps(error, cls=JSONEncoder, ensure_ascii=False))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']} usuários criados, {len(result['errors'])} linhas rejeitadas."
+        ))
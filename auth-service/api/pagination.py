@@ -0,0 +1,115 @@
+import base64
+import json
+import uuid
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class UserKeysetPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) sobre a ordenação estável ``(role, user_id)``.
+
+    Cada página é buscada com ``WHERE (role, user_id) > cursor LIMIT n``, então o
+    custo não cresce com a profundidade da página. A navegação é apenas para
+    frente: a resposta traz o link ``next`` enquanto houver mais registros.
+    """
+    ordering = ('role', 'user_id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Versão assíncrona de ``paginate_queryset``, lendo com o ORM assíncrono.
+        """
+        return self.set_page([row async for row in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(position))
+
+        # Busca um registro a mais apenas para saber se existe próxima página
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'results': data,
+        }
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        config = settings.USER_LIST_PAGINATION
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return config['PAGE_SIZE']
+        if page_size <= 0:
+            return config['PAGE_SIZE']
+        return min(page_size, config['MAX_PAGE_SIZE'])
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        position = [str(self.get_value(last, field)) for field in self.ordering]
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(position))
+
+    def position_filter(self, position):
+        role, user_id = position
+        # Equivalente a (role, user_id) > (%s, %s), escrito de forma que o
+        # primeiro campo vire um range aproveitável pelo índice composto.
+        return Q(role__gte=role) & (Q(role__gt=role) | Q(role=role, user_id__gt=user_id))
+
+    def encode_cursor(self, position):
+        data = json.dumps(position, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            role, user_id = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            return [str(role), uuid.UUID(user_id)]
+        except (TypeError, ValueError, AttributeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_value(self, item, field):
+        if isinstance(item, dict):
+            return item[field]
+        return getattr(item, field)
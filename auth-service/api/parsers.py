@@ -0,0 +1,28 @@
+from django.conf import settings
+from rest_framework.parsers import BaseParser
+from .importer import iter_csv, iter_ndjson
+
+
+class StreamingParser(BaseParser):
+    """
+    Base para parsers que devolvem um iterador lido sob demanda do corpo da
+    requisição, sem carregá-lo inteiro em memória.
+    """
+    reader = None
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return iter(())
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        return self.reader(stream, encoding)
+
+
+class CSVParser(StreamingParser):
+    media_type = 'text/csv'
+    reader = staticmethod(iter_csv)
+
+
+class NDJSONParser(StreamingParser):
+    media_type = 'application/x-ndjson'
+    reader = staticmethod(iter_ndjson)
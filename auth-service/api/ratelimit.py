@@ -0,0 +1,250 @@
+import hashlib
+import math
+import threading
+import time
+from array import array
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework.throttling import BaseThrottle
+from core.metrics import register_metrics
+
+
+class MemoryCounterStore:
+    """
+    Contadores de janela deslizante na memória do processo.
+
+    A janela é dividida em ``buckets`` fatias de tempo; cada chave guarda um
+    anel com a contagem e a época de cada fatia, em dois ``array`` de
+    tamanho fixo. Fatias de épocas que já saíram da janela são ignoradas na
+    soma e reaproveitadas na próxima tentativa. No máximo ``max_keys``
+    chaves são mantidas, descartando a usada há mais tempo.
+    """
+    blocking = False
+
+    def __init__(self, window, buckets, max_keys):
+        self.bucket_seconds = window / buckets
+        self.buckets = buckets
+        self.max_keys = max_keys
+        self._rings = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, now=None):
+        epoch = self._epoch(now)
+        slot = epoch % self.buckets
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is None:
+                ring = self._rings[key] = (array('I', [0] * self.buckets), array('q', [-1] * self.buckets))
+                if len(self._rings) > self.max_keys:
+                    self._rings.popitem(last=False)
+            else:
+                self._rings.move_to_end(key)
+            counts, epochs = ring
+            if epochs[slot] != epoch:
+                epochs[slot] = epoch
+                counts[slot] = 0
+            counts[slot] += 1
+
+    def count(self, key, now=None):
+        oldest = self._epoch(now) - self.buckets
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is None:
+                return 0
+            counts, epochs = ring
+            return sum(count for count, epoch in zip(counts, epochs) if epoch > oldest)
+
+    def reset(self, key):
+        with self._lock:
+            self._rings.pop(key, None)
+
+    def _epoch(self, now):
+        return int((time.time() if now is None else now) // self.bucket_seconds)
+
+
+class CacheCounterStore:
+    """
+    Contadores de janela deslizante em um cache do Django (CACHES), para
+    compartilhar as contagens entre processos e instâncias (ex.: Redis).
+
+    Cada fatia da janela é uma chave ``<chave>:<época>`` incrementada com
+    ``incr``; a contagem da janela é lida com um único ``get_many``.
+    """
+    blocking = True
+
+    def __init__(self, window, buckets, cache_alias):
+        self.bucket_seconds = window / buckets
+        self.buckets = buckets
+        self.cache = caches[cache_alias]
+        self.timeout = math.ceil(window + self.bucket_seconds)
+
+    def hit(self, key, now=None):
+        bucket_key = f'{key}:{self._epoch(now)}'
+        self.cache.add(bucket_key, 0, timeout=self.timeout)
+        try:
+            self.cache.incr(bucket_key)
+        except ValueError:
+            # A fatia expirou entre o add e o incr
+            self.cache.set(bucket_key, 1, timeout=self.timeout)
+
+    def count(self, key, now=None):
+        return sum(self.cache.get_many(self._window_keys(key, now)).values())
+
+    def reset(self, key):
+        self.cache.delete_many(self._window_keys(key))
+
+    def _window_keys(self, key, now=None):
+        epoch = self._epoch(now)
+        return [f'{key}:{bucket}' for bucket in range(epoch - self.buckets + 1, epoch + 1)]
+
+    def _epoch(self, now):
+        return int((time.time() if now is None else now) // self.bucket_seconds)
+
+
+class LoginRateLimiter:
+    """
+    Limita as falhas de login por IP e por e-mail em uma janela deslizante.
+
+    ``check`` é chamado antes de qualquer trabalho de hashing: acima do
+    limite a tentativa é recusada sem consultar o banco nem verificar a
+    senha. Só as falhas contam; um login bem-sucedido zera o contador do
+    e-mail. As recusas são contadas por escopo em ``rejections``.
+    """
+
+    def __init__(self, store, ip_limit, email_limit):
+        self.store = store
+        self.limits = {'ip': ip_limit, 'email': email_limit}
+        self.retry_after = math.ceil(store.bucket_seconds)
+        self.rejections = Counter()
+        self._lock = threading.Lock()
+
+    def check(self, ip, email):
+        """
+        Retorna o Retry-After em segundos se a tentativa deve ser recusada,
+        ou ``None`` se pode prosseguir.
+        """
+        for scope, key in self.keys(ip, email):
+            if self.store.count(key) >= self.limits[scope]:
+                with self._lock:
+                    self.rejections[scope] += 1
+                return self.retry_after
+        return None
+
+    def record_failure(self, ip, email):
+        for _, key in self.keys(ip, email):
+            self.store.hit(key)
+
+    def record_success(self, ip, email):
+        if email:
+            self.store.reset(self.email_key(email))
+
+    async def acheck(self, ip, email):
+        return await self._run(self.check, ip, email)
+
+    async def arecord_failure(self, ip, email):
+        return await self._run(self.record_failure, ip, email)
+
+    async def arecord_success(self, ip, email):
+        return await self._run(self.record_success, ip, email)
+
+    def metrics(self):
+        with self._lock:
+            return {f'rejected_{scope}': self.rejections[scope] for scope in self.limits}
+
+    def keys(self, ip, email):
+        keys = []
+        if ip:
+            keys.append(('ip', f'login:ip:{ip}'))
+        if email:
+            keys.append(('email', self.email_key(email)))
+        return keys
+
+    def email_key(self, email):
+        # O e-mail não vai em claro para o store compartilhado
+        digest = hashlib.blake2b(email.strip().lower().encode(), digest_size=16).hexdigest()
+        return f'login:email:{digest}'
+
+    async def _run(self, func, *args):
+        # Stores em rede não devem bloquear o event loop
+        if self.store.blocking:
+            return await sync_to_async(func)(*args)
+        return func(*args)
+
+
+class DisabledRateLimiter:
+    """
+    Usado quando LOGIN_RATE_LIMIT['ENABLED'] é falso: nunca recusa.
+    """
+
+    def check(self, ip, email):
+        return None
+
+    def record_failure(self, ip, email):
+        pass
+
+    def record_success(self, ip, email):
+        pass
+
+    async def acheck(self, ip, email):
+        return None
+
+    async def arecord_failure(self, ip, email):
+        pass
+
+    async def arecord_success(self, ip, email):
+        pass
+
+    def metrics(self):
+        return {}
+
+
+@lru_cache(maxsize=None)
+def get_login_rate_limiter():
+    """
+    Retorna o limitador de login do processo, criado a partir de
+    LOGIN_RATE_LIMIT.
+    """
+    config = settings.LOGIN_RATE_LIMIT
+    if not config['ENABLED']:
+        return DisabledRateLimiter()
+    if config['STORE'] == 'memory':
+        store = MemoryCounterStore(config['WINDOW'], config['BUCKETS'], config['MAX_KEYS'])
+    elif config['STORE'] == 'cache':
+        store = CacheCounterStore(config['WINDOW'], config['BUCKETS'], config['CACHE_ALIAS'])
+    else:
+        raise ImproperlyConfigured(
+            f"LOGIN_RATE_LIMIT['STORE'] inválido: {config['STORE']!r}"
+        )
+    return LoginRateLimiter(store, config['IP_LIMIT'], config['EMAIL_LIMIT'])
+
+
+@register_metrics('login_rate_limit')
+def login_rate_limit_metrics():
+    return get_login_rate_limiter().metrics()
+
+
+@receiver(setting_changed)
+def reset_login_rate_limiter(*, setting, **kwargs):
+    if setting == 'LOGIN_RATE_LIMIT':
+        get_login_rate_limiter.cache_clear()
+
+
+def get_client_ip(request):
+    """
+    IP do cliente, respeitando NUM_PROXIES do REST_FRAMEWORK como os
+    throttles do DRF. Sem proxies confiáveis (NUM_PROXIES=0), usa o
+    REMOTE_ADDR: um X-Forwarded-For diferente a cada tentativa não escapa
+    do limite por IP.
+    """
+    return BaseThrottle().get_ident(request)
+
+
+def get_login_email(data):
+    email = data.get('email') if isinstance(data, dict) else None
+    return email if isinstance(email, str) else None
@@ -0,0 +1,21 @@
+import json
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renderiza uma lista como JSON delimitado por linhas (um objeto por linha).
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        return b''.join(self.render_line(item) for item in items)
+
+    def render_line(self, item):
+        return json.dumps(item, cls=JSONEncoder, ensure_ascii=False).encode() + b'\n'
@@ -0,0 +1,9 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    """
+    Publica o ClaimsJWTAuthentication no OpenAPI como o esquema bearer
+    ``jwtAuth`` do SimpleJWT, que só reconhece a classe JWTAuthentication.
+    """
+    target_class = 'api.authentication.ClaimsJWTAuthentication'
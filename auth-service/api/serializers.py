@@ -1,18 +1,71 @@
+import time
+from contextlib import nullcontext
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
 from rest_framework import serializers
-from rest_framework.validators import UniqueValidator
+from rest_framework_simplejwt import settings as simplejwt_settings
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from django.contrib.auth.password_validation import validate_password
-from core.models import User
+from django.utils.translation import gettext_lazy as _
+from core.metrics import stage_histogram, stage_timer
+from core.models import TYPES_USER_CHOICES, User
+from .tokens import TOKEN_VERSION_CLAIM, RefreshToken, consume_refresh_token
+from .unknown_users import get_known_email_filter, get_unknown_user_path
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('user_id', 'email', 'role') 
 
+class UserValuesSerializer(serializers.BaseSerializer):
+    """
+    Serializer somente leitura para linhas de ``User.objects.values()``.
+
+    Produz a mesma saída do UserSerializer sem instanciar o model: os
+    conversores de cada campo são resolvidos uma única vez e reutilizados
+    para todas as linhas.
+    """
+    field_names = UserSerializer.Meta.fields
+    _converters = None
+
+    @classmethod
+    def get_converters(cls):
+        if cls._converters is None:
+            fields = UserSerializer().fields
+            cls._converters = tuple(
+                (name, fields[name].to_representation) for name in cls.field_names
+            )
+        return cls._converters
+
+    def to_representation(self, row):
+        return {
+            name: None if row[name] is None else convert(row[name])
+            for name, convert in self.get_converters()
+        }
+
+EMAIL_IN_USE_MESSAGE = "Este e-mail já está em uso."
+SINGLE_ADMIN_MESSAGE = "Só pode existir um único admin no sistema"
+
+def unique_violation_errors(email):
+    """
+    Traduz a violação de uma constraint única de User na mesma mensagem de
+    validação usada antes do INSERT. Só roda no caminho de erro, então a
+    consulta extra não pesa no cadastro bem-sucedido.
+    """
+    if User.objects.by_email(email).exists():
+        return {"email": [EMAIL_IN_USE_MESSAGE]}
+    return {"role": [SINGLE_ADMIN_MESSAGE]}
+
 class RegisterSerializer(serializers.ModelSerializer):
-    email = serializers.EmailField(
-        required=True,
-        validators=[UniqueValidator(queryset=User.objects.all(), message="Este e-mail já está em uso.")]
-    )
+    """
+    Cadastro de usuário.
+
+    A unicidade do e-mail e a regra de admin único são garantidas pelas
+    constraints do banco: o cadastro custa apenas o INSERT, e a
+    IntegrityError de um cadastro concorrente vira o mesmo erro de validação.
+    """
+    email = serializers.EmailField(required=True)
 
     password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
     password2 = serializers.CharField(write_only=True, required=True, label="Confirme a senha")
@@ -21,7 +74,9 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = User
         fields = ('email', 'role', 'password', 'password2') 
         extra_kwargs = {
-            'role': {'required': True}
+            # Sem o UniqueValidator gerado a partir da constraint unique_admin,
+            # que consultaria o banco antes do INSERT
+            'role': {'required': True, 'validators': []}
         }
 
     def validate(self, attrs):
@@ -29,7 +84,6 @@ class RegisterSerializer(serializers.ModelSerializer):
         Validação customizada para garantir que as senhas coincidem.
         """
         self._validate_password(attrs)
-        self._validate_admin(attrs)
         return attrs
 
     def create(self, validated_data):
@@ -37,34 +91,149 @@ class RegisterSerializer(serializers.ModelSerializer):
         Cria e retorna um novo usuário após a validação.
         """
         validated_data.pop('password2', None)
-        user = User.objects.create_user(
-            email=validated_data['email'],
-            password=validated_data['password'],
-            role=validated_data.get('role')
-        )
+        # Fora de uma transação o INSERT que falha não deixa nada pendente;
+        # dentro de uma, o savepoint mantém a transação externa utilizável.
+        savepoint = transaction.atomic() if connection.in_atomic_block else nullcontext()
+        try:
+            with savepoint:
+                user = User.objects.create_user(
+                    email=validated_data['email'],
+                    password=validated_data['password'],
+                    role=validated_data.get('role')
+                )
+        except IntegrityError:
+            raise serializers.ValidationError(unique_violation_errors(validated_data['email']))
         return user
 
     def _validate_password(self, attrs):
         if attrs['password'] != attrs['password2']:
             raise serializers.ValidationError({"password": "As senhas não coincidem."})
         return attrs
-    
-    def _validate_admin(self, attrs):
-        if attrs.get('is_staff') or attrs.get('role') == 'admin':
-            if User.objects.filter(role='admin').exists():
-                raise serializers.ValidationError({"role": "Só pode existir um único admin no sistema"})
-        return attrs
 
-class LoginSerializer(serializers.Serializer):
+class BulkUserSerializer(serializers.Serializer):
+    """
+    Valida o formato de uma linha da importação em lote. Unicidade do e-mail
+    e a regra de admin único são verificadas por lote no UserImporter.
+    """
+    email = serializers.EmailField()
+    role = serializers.ChoiceField(choices=TYPES_USER_CHOICES)
+    password = serializers.CharField(write_only=True, validators=[validate_password])
+
+class LoginCredentialsSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
 
+class LoginSerializer(LoginCredentialsSerializer):
+
     def validate(self, attrs):
         email = attrs.get('email')
         password = attrs.get('password')
 
-        user = User.objects.filter(email=email).first()
-        if not user or not user.check_password(password):
+        user = None
+        email_filter = get_known_email_filter()
+        with stage_timer('login', 'lookup'):
+            if email_filter is None or email_filter.might_contain(email):
+                user = User.objects.by_email(email).first()
+
+        unknown_user_path = get_unknown_user_path()
+        if user is None:
+            # Mesmo tempo de resposta de uma senha errada, sem revelar se o
+            # e-mail existe
+            with stage_timer('login', 'unknown_user'):
+                unknown_user_path.run(password)
+            raise serializers.ValidationError("Credenciais inválidas.")
+
+        start = time.perf_counter()
+        valid = user.check_password(password)
+        elapsed = time.perf_counter() - start
+        unknown_user_path.observe(elapsed)
+        stage_histogram('login', 'check_password').observe(elapsed)
+        if not valid:
             raise serializers.ValidationError("Credenciais inválidas.")
         attrs['user'] = user
-        return attrs
\ No newline at end of file
+        return attrs
+
+class PasswordChangeSerializer(serializers.Serializer):
+    old_password = serializers.CharField(write_only=True)
+    new_password = serializers.CharField(write_only=True, validators=[validate_password])
+
+    def validate_old_password(self, value):
+        if not self.instance.check_password(value):
+            raise serializers.ValidationError("Senha atual incorreta.")
+        return value
+
+    def update(self, instance, validated_data):
+        """
+        Troca a senha e revoga os tokens emitidos antes da troca.
+        """
+        instance.set_password(validated_data['new_password'])
+        instance.token_version = F('token_version') + 1
+        instance.save(update_fields=['password', 'token_version'])
+        return instance
+
+class UserBatchLookupSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False)
+    emails = serializers.ListField(child=serializers.EmailField(), required=False)
+
+    def validate(self, attrs):
+        limit = settings.USER_BATCH_LOOKUP['MAX_ITEMS']
+        total = len(attrs.get('ids', ())) + len(attrs.get('emails', ()))
+        if not total:
+            raise serializers.ValidationError("Informe 'ids' ou 'emails'.")
+        if total > limit:
+            raise serializers.ValidationError(f"Envie no máximo {limit} IDs e e-mails por requisição.")
+        return attrs
+
+class IntrospectionSerializer(serializers.Serializer):
+    token = serializers.CharField(required=False)
+    tokens = serializers.ListField(child=serializers.CharField(), required=False, allow_empty=False)
+
+    def validate_tokens(self, value):
+        limit = settings.TOKEN_INTROSPECTION_MAX_BATCH
+        if len(value) > limit:
+            raise serializers.ValidationError(f"Envie no máximo {limit} tokens por requisição.")
+        return value
+
+    def validate(self, attrs):
+        if ('token' in attrs) == ('tokens' in attrs):
+            raise serializers.ValidationError("Informe 'token' ou 'tokens'.")
+        return attrs
+
+REFRESH_TOKEN_REUSED_MESSAGE = "Refresh token já utilizado; todas as sessões foram encerradas."
+
+# Campos do usuário que vão para as claims dos tokens renovados
+REFRESH_USER_FIELDS = ('pk', 'role', 'is_staff', 'is_active', 'token_version')
+
+
+class TokenRefreshSerializer(serializers.Serializer):
+    """
+    Troca um refresh token por um novo access token, sem verificar senha.
+
+    Com ROTATE_REFRESH_TOKENS, o refresh token é consumido e substituído por
+    um novo. Apresentar de novo um token já trocado indica que ele vazou:
+    todos os tokens do usuário são revogados.
+    """
+    refresh = serializers.CharField(write_only=True)
+
+    def validate(self, attrs):
+        try:
+            refresh = RefreshToken(attrs['refresh'])
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        jwt_settings = simplejwt_settings.api_settings
+        user_id = refresh[jwt_settings.USER_ID_CLAIM]
+        # role e is_staff vêm do banco, não do token antigo
+        user = User.objects.filter(pk=user_id, is_active=True).only(*REFRESH_USER_FIELDS).first()
+        # Usuário inativo, removido ou com os tokens revogados
+        if user is None or user.token_version != refresh.get(TOKEN_VERSION_CLAIM):
+            raise InvalidToken(_('Token has been revoked'))
+
+        fresh = RefreshToken.for_user(user)
+        data = {'access': str(fresh.access_token)}
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if not consume_refresh_token(refresh):
+                User.objects.revoke_tokens(user_id)
+                raise InvalidToken(REFRESH_TOKEN_REUSED_MESSAGE)
+            data['refresh'] = str(fresh)
+        return data
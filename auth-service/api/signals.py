@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from core.models import User
+from .unknown_users import remember_emails
+
+
+@receiver(post_save, sender=User, dispatch_uid='api.remember_known_email')
+def remember_known_email(sender, instance, **kwargs):
+    """
+    Mantém o filtro de e-mails cadastrados atualizado neste processo.
+    """
+    remember_emails([instance.email])
@@ -0,0 +1,122 @@
+import io
+import json
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from api.importer import UserImporter, iter_csv, iter_ndjson
+from core.factories import AdminUserFactory, UserFactory
+from core.models import User
+
+PASSWORD = 'SecurePass123!'
+
+
+def row(email, role='client', password=PASSWORD):
+    return {'email': email, 'role': role, 'password': password}
+
+
+@pytest.mark.django_db
+class TestUserImporter:
+    """Testes para UserImporter"""
+
+    def test_imports_valid_rows(self):
+        """Testa importação de linhas válidas"""
+        result = UserImporter(hash_workers=1).run([row('a@example.com'), row('b@example.com', 'collaborator')])
+
+        assert result == {'created': 2, 'errors': []}
+        user = User.objects.get(email='b@example.com')
+        assert user.role == 'collaborator'
+        assert user.check_password(PASSWORD)
+
+    def test_updates_user_counts(self):
+        """Testa que os usuários inseridos em lote entram em UserCount"""
+        from core.stats import get_user_stats
+        UserImporter(hash_workers=1).run([row('a@example.com'), row('b@example.com', 'collaborator')])
+
+        roles = get_user_stats()['roles']
+        assert roles['client']['active'] == 1
+        assert roles['collaborator']['active'] == 1
+
+    def test_reports_errors_per_row(self):
+        """Testa que linhas inválidas são reportadas sem interromper a importação"""
+        UserFactory(email='existing@example.com')
+        rows = [
+            row('ok@example.com'),
+            row('existing@example.com'),
+            row('invalid-email'),
+            row('weak@example.com', password='123'),
+            row('ok@example.com'),
+            'linha quebrada',
+        ]
+        result = UserImporter(hash_workers=1).run(rows)
+
+        assert result['created'] == 1
+        errors = {error['line']: error for error in result['errors']}
+        assert set(errors) == {2, 3, 4, 5, 6}
+        assert 'email' in errors[2]['errors']
+        assert 'email' in errors[3]['errors']
+        assert 'password' in errors[4]['errors']
+        assert 'email' in errors[5]['errors']
+
+    def test_single_admin_rule(self):
+        """Testa que a importação respeita a regra de admin único"""
+        result = UserImporter(hash_workers=1).run([row('admin1@example.com', 'admin'), row('admin2@example.com', 'admin')])
+
+        assert result['created'] == 1
+        assert result['errors'][0]['line'] == 2
+        assert 'role' in result['errors'][0]['errors']
+
+    def test_rejects_admin_when_one_exists(self):
+        """Testa que não importa admin se já existir um"""
+        AdminUserFactory()
+        result = UserImporter(hash_workers=1).run([row('admin@example.com', 'admin')])
+
+        assert result['created'] == 0
+        assert 'role' in result['errors'][0]['errors']
+
+    def test_checks_uniqueness_with_one_query_per_batch(self):
+        """Testa que a unicidade é verificada com uma consulta por lote"""
+        rows = [row(f'user{i}@example.com') for i in range(4)]
+        with CaptureQueriesContext(connection) as queries:
+            UserImporter(batch_size=2, hash_workers=1).run(rows)
+
+        selects = [query for query in queries if query['sql'].startswith('SELECT')]
+        assert len(selects) == 2
+        assert User.objects.count() == 4
+
+    def test_readers(self):
+        """Testa a leitura de CSV e NDJSON"""
+        csv_data = io.BytesIO(b'email,role,password\na@example.com,client,pw\n')
+        ndjson_data = io.BytesIO(b'{"email": "a@example.com"}\n\nnot json\n')
+
+        assert list(iter_csv(csv_data)) == [{'email': 'a@example.com', 'role': 'client', 'password': 'pw'}]
+        assert list(iter_ndjson(ndjson_data)) == [{'email': 'a@example.com'}, 'not json']
+
+
+@pytest.mark.django_db
+class TestImportUsersCommand:
+    """Testes para o comando import_users"""
+
+    def test_imports_csv_file(self, tmp_path):
+        """Testa importação de um arquivo CSV"""
+        path = tmp_path / 'users.csv'
+        path.write_text(f'email,role,password\na@example.com,client,{PASSWORD}\nb@example.com,client,123\n')
+        errors = tmp_path / 'errors.ndjson'
+        out = io.StringIO()
+
+        call_command('import_users', str(path), '--workers', '1', '--errors', str(errors), stdout=out)
+
+        assert User.objects.filter(email='a@example.com').exists()
+        assert '1 usuários criados, 1 linhas rejeitadas.' in out.getvalue()
+        report = [json.loads(line) for line in errors.read_text().splitlines()]
+        assert report[0]['line'] == 2
+        assert 'password' in report[0]['errors']
+
+    def test_imports_ndjson_file(self, tmp_path):
+        """Testa importação de um arquivo NDJSON"""
+        path = tmp_path / 'users.ndjson'
+        path.write_text(json.dumps(row('a@example.com')) + '\n')
+
+        call_command('import_users', str(path), '--workers', '1', stdout=io.StringIO())
+
+        assert User.objects.filter(email='a@example.com').exists()
@@ -0,0 +1,102 @@
+from api.ratelimit import CacheCounterStore, LoginRateLimiter, MemoryCounterStore
+
+
+class TestMemoryCounterStore:
+    """Testes para MemoryCounterStore"""
+
+    def test_counts_hits_inside_window(self):
+        """Testa que a contagem soma as fatias dentro da janela"""
+        store = MemoryCounterStore(window=60, buckets=6, max_keys=10)
+        store.hit('key', now=0)
+        store.hit('key', now=15)
+        store.hit('key', now=59)
+
+        assert store.count('key', now=59) == 3
+        assert store.count('other', now=59) == 0
+
+    def test_window_slides(self):
+        """Testa que fatias antigas saem da janela"""
+        store = MemoryCounterStore(window=60, buckets=6, max_keys=10)
+        store.hit('key', now=0)
+        store.hit('key', now=30)
+
+        assert store.count('key', now=65) == 1
+        assert store.count('key', now=95) == 0
+
+    def test_reused_slot_is_reset(self):
+        """Testa que a fatia reaproveitada do anel começa zerada"""
+        store = MemoryCounterStore(window=60, buckets=6, max_keys=10)
+        store.hit('key', now=0)
+        store.hit('key', now=60)
+
+        assert store.count('key', now=60) == 1
+
+    def test_evicts_least_recently_used_key(self):
+        """Testa que o número de chaves é limitado"""
+        store = MemoryCounterStore(window=60, buckets=6, max_keys=2)
+        store.hit('a', now=0)
+        store.hit('b', now=0)
+        store.hit('a', now=1)
+        store.hit('c', now=1)
+
+        assert store.count('a', now=1) == 2
+        assert store.count('b', now=1) == 0
+        assert store.count('c', now=1) == 1
+
+
+class TestCacheCounterStore:
+    """Testes para CacheCounterStore"""
+
+    def test_counts_and_slides(self):
+        """Testa a janela deslizante sobre o cache"""
+        store = CacheCounterStore(window=60, buckets=6, cache_alias='default')
+        store.hit('key', now=0)
+        store.hit('key', now=30)
+
+        assert store.count('key', now=30) == 2
+        assert store.count('key', now=65) == 1
+
+    def test_reset(self):
+        """Testa que reset apaga as fatias da janela"""
+        store = CacheCounterStore(window=60, buckets=6, cache_alias='default')
+        store.hit('key')
+        store.reset('key')
+
+        assert store.count('key') == 0
+
+
+class TestLoginRateLimiter:
+    """Testes para LoginRateLimiter"""
+
+    def limiter(self, ip_limit=10, email_limit=2):
+        return LoginRateLimiter(MemoryCounterStore(60, 6, 100), ip_limit, email_limit)
+
+    def test_rejects_after_email_limit(self):
+        """Testa a recusa após o limite de falhas por e-mail"""
+        limiter = self.limiter()
+        for _ in range(2):
+            assert limiter.check('1.1.1.1', 'User@Example.com') is None
+            limiter.record_failure('1.1.1.1', 'User@Example.com')
+
+        assert limiter.check('2.2.2.2', 'user@example.com') == 10
+        assert limiter.check('2.2.2.2', 'other@example.com') is None
+        assert limiter.metrics() == {'rejected_ip': 0, 'rejected_email': 1}
+
+    def test_rejects_after_ip_limit(self):
+        """Testa a recusa após o limite de falhas por IP"""
+        limiter = self.limiter(ip_limit=3, email_limit=100)
+        for i in range(3):
+            limiter.record_failure('1.1.1.1', f'user{i}@example.com')
+
+        assert limiter.check('1.1.1.1', 'new@example.com') is not None
+        assert limiter.check('2.2.2.2', 'new@example.com') is None
+        assert limiter.metrics()['rejected_ip'] == 1
+
+    def test_success_resets_email(self):
+        """Testa que um login bem-sucedido zera o contador do e-mail"""
+        limiter = self.limiter()
+        limiter.record_failure('1.1.1.1', 'user@example.com')
+        limiter.record_success('1.1.1.1', 'user@example.com')
+        limiter.record_failure('1.1.1.1', 'user@example.com')
+
+        assert limiter.check('1.1.1.1', 'user@example.com') is None
@@ -1,5 +1,8 @@
 import pytest
-from api.serializers import RegisterSerializer, LoginSerializer, UserSerializer
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+from api.serializers import RegisterSerializer, LoginSerializer, UserSerializer, UserValuesSerializer
 from core.models import User
 from core.factories import UserFactory, AdminUserFactory
 
@@ -21,6 +24,25 @@ class TestUserSerializer:
         assert 'password' not in serializer.data
 
 
+@pytest.mark.django_db
+class TestUserValuesSerializer:
+    """Testes para UserValuesSerializer"""
+
+    def test_matches_user_serializer_output(self):
+        """Testa que a saída é idêntica à do UserSerializer"""
+        user = UserFactory(role='collaborator')
+        row = User.objects.values(*UserValuesSerializer.field_names).get(pk=user.pk)
+        assert UserValuesSerializer(row).data == UserSerializer(user).data
+
+    def test_many_rows(self):
+        """Testa serialização de várias linhas"""
+        UserFactory.create_batch(3)
+        rows = User.objects.values(*UserValuesSerializer.field_names)
+        data = UserValuesSerializer(rows, many=True).data
+        assert len(data) == 3
+        assert all(set(item.keys()) == {'user_id', 'email', 'role'} for item in data)
+
+
 @pytest.mark.django_db
 class TestRegisterSerializer:
     """Testes para RegisterSerializer"""
@@ -63,8 +85,10 @@ class TestRegisterSerializer:
             'role': 'client'
         }
         serializer = RegisterSerializer(data=data)
-        assert not serializer.is_valid()
-        assert 'email' in serializer.errors
+        assert serializer.is_valid()
+        with pytest.raises(ValidationError) as exc_info:
+            serializer.save()
+        assert 'Este e-mail já está em uso.' in str(exc_info.value.detail['email'])
 
     def test_weak_password_is_rejected(self):
         """Testa que senha fraca é rejeitada"""
@@ -110,9 +134,27 @@ class TestRegisterSerializer:
             'role': 'admin'
         }
         serializer = RegisterSerializer(data=data)
-        assert not serializer.is_valid()
-        assert 'role' in serializer.errors
-        assert 'Só pode existir um único admin no sistema' in str(serializer.errors['role'])
+        assert serializer.is_valid()
+        with pytest.raises(ValidationError) as exc_info:
+            serializer.save()
+        assert 'Só pode existir um único admin no sistema' in str(exc_info.value.detail['role'])
+
+    def test_register_only_inserts(self):
+        """Testa que o cadastro não faz consultas de validação antes do INSERT"""
+        data = {
+            'email': 'test@example.com',
+            'password': 'SecurePass123!',
+            'password2': 'SecurePass123!',
+            'role': 'admin'
+        }
+        serializer = RegisterSerializer(data=data)
+        with CaptureQueriesContext(connection) as queries:
+            assert serializer.is_valid()
+            serializer.save()
+
+        statements = [query['sql'].split()[0] for query in queries]
+        assert 'SELECT' not in statements
+        assert statements.count('INSERT') == 1
 
     def test_can_create_admin_when_none_exists(self):
         """Testa que pode criar admin quando nenhum existe"""
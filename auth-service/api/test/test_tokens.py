@@ -0,0 +1,274 @@
+import time
+from datetime import timedelta
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from api.tokens import AccessToken, RefreshToken, check_refresh_token_cache, consume_refresh_token, refresh_token_cache
+from core.factories import UserFactory
+
+
+def write_private_key(directory, kid, key):
+    (directory / f'{kid}.pem').write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+
+
+def write_public_key(directory, kid, key):
+    (directory / f'{kid}.pub.pem').write_bytes(key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ))
+
+
+def use_keys(settings, algorithm, keys_dir, active_kid):
+    settings.SIMPLE_JWT = {**settings.SIMPLE_JWT, 'ALGORITHM': algorithm}
+    settings.JWT_SIGNING = {'KEYS_DIR': keys_dir, 'ACTIVE_KID': active_kid}
+
+
+@pytest.fixture
+def rsa_keys(tmp_path, settings):
+    write_private_key(tmp_path, 'k1', rsa.generate_private_key(public_exponent=65537, key_size=2048))
+    use_keys(settings, 'RS256', tmp_path, 'k1')
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestAsymmetricTokens:
+    """Testes para a assinatura assimétrica dos tokens"""
+
+    def test_token_header_contains_kid(self, rsa_keys):
+        """Testa que o token é assinado com RS256 e traz o kid da chave ativa"""
+        token = str(RefreshToken.for_user(UserFactory()).access_token)
+        header = jwt.get_unverified_header(token)
+        assert header['alg'] == 'RS256'
+        assert header['kid'] == 'k1'
+        assert AccessToken(token)['token_type'] == 'access'
+
+    def test_token_verifies_with_published_jwks(self, rsa_keys):
+        """Testa que um consumidor verifica o token apenas com o JWKS"""
+        user = UserFactory()
+        token = str(RefreshToken.for_user(user).access_token)
+        response = APIClient().get(reverse('jwks'))
+        jwk = jwt.PyJWKSet.from_dict(response.json())[jwt.get_unverified_header(token)['kid']]
+
+        payload = jwt.decode(token, jwk.key, algorithms=['RS256'])
+        assert payload['user_id'] == str(user.user_id)
+
+    def test_rotated_key_still_verifies_old_tokens(self, rsa_keys, settings):
+        """Testa que tokens da chave anterior continuam válidos após a rotação"""
+        old_token = str(RefreshToken.for_user(UserFactory()).access_token)
+        write_private_key(rsa_keys, 'k2', rsa.generate_private_key(public_exponent=65537, key_size=2048))
+        use_keys(settings, 'RS256', rsa_keys, 'k2')
+
+        new_token = str(RefreshToken.for_user(UserFactory()).access_token)
+        assert jwt.get_unverified_header(new_token)['kid'] == 'k2'
+        assert AccessToken(old_token)
+        assert AccessToken(new_token)
+
+    def test_public_only_key_is_accepted_for_verification(self, rsa_keys, settings):
+        """Testa que uma chave aposentada (só pública) ainda verifica tokens"""
+        old_token = str(RefreshToken.for_user(UserFactory()).access_token)
+        old_key = serialization.load_pem_private_key((rsa_keys / 'k1.pem').read_bytes(), password=None)
+        (rsa_keys / 'k1.pem').unlink()
+        write_public_key(rsa_keys, 'k1', old_key)
+        write_private_key(rsa_keys, 'k2', rsa.generate_private_key(public_exponent=65537, key_size=2048))
+        use_keys(settings, 'RS256', rsa_keys, 'k2')
+
+        assert AccessToken(old_token)
+
+    def test_unknown_kid_is_rejected(self, rsa_keys, settings, tmp_path_factory):
+        """Testa que tokens assinados por uma chave desconhecida são rejeitados"""
+        other_dir = tmp_path_factory.mktemp('other')
+        write_private_key(other_dir, 'k9', rsa.generate_private_key(public_exponent=65537, key_size=2048))
+        use_keys(settings, 'RS256', other_dir, 'k9')
+        foreign_token = str(RefreshToken.for_user(UserFactory()).access_token)
+
+        use_keys(settings, 'RS256', rsa_keys, 'k1')
+        with pytest.raises(TokenError):
+            AccessToken(foreign_token)
+
+    def test_eddsa_signing(self, tmp_path, settings):
+        """Testa assinatura com EdDSA (Ed25519)"""
+        write_private_key(tmp_path, 'ed1', ed25519.Ed25519PrivateKey.generate())
+        use_keys(settings, 'EdDSA', tmp_path, 'ed1')
+
+        token = str(RefreshToken.for_user(UserFactory()).access_token)
+        assert jwt.get_unverified_header(token)['alg'] == 'EdDSA'
+        assert AccessToken(token)
+
+
+@pytest.mark.django_db
+class TestJWKSView:
+    """Testes para JWKSView"""
+
+    def test_jwks_lists_public_keys(self, rsa_keys):
+        """Testa que o JWKS publica as chaves com cache longo"""
+        response = APIClient().get(reverse('jwks'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert 'public' in response['Cache-Control']
+        keys = response.json()['keys']
+        assert [key['kid'] for key in keys] == ['k1']
+        assert keys[0]['kty'] == 'RSA'
+        assert 'd' not in keys[0]
+
+    def test_jwks_is_empty_for_shared_secret(self):
+        """Testa que o JWKS é vazio com assinatura HS256"""
+        response = APIClient().get(reverse('jwks'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'keys': []}
+
+
+@pytest.mark.django_db
+class TestTokenClaims:
+    """Testes para as claims embutidas nos tokens"""
+
+    def test_access_token_carries_user_claims(self):
+        """Testa que o access token traz role, is_staff e is_active"""
+        user = UserFactory(role='collaborator')
+        access = AccessToken(str(RefreshToken.for_user(user).access_token))
+        assert access['role'] == 'collaborator'
+        assert access['is_staff'] is False
+        assert access['is_active'] is True
+
+
+@pytest.mark.django_db
+class TestClaimsJWTAuthentication:
+    """Testes para ClaimsJWTAuthentication"""
+
+    def authenticate(self, token):
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+        from api.authentication import ClaimsJWTAuthentication
+        request = Request(APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+        return ClaimsJWTAuthentication().authenticate(request)
+
+    def test_authenticates_without_database_queries(self, settings, django_assert_num_queries):
+        """Testa que a autenticação monta o usuário sem consultar o banco"""
+        settings.JWT_REVOCATION_CHECK = 'none'
+        user = UserFactory(role='collaborator')
+        token = str(RefreshToken.for_user(user).access_token)
+
+        with django_assert_num_queries(0):
+            request_user, _ = self.authenticate(token)
+        assert request_user.id == str(user.user_id)
+        assert request_user.role == 'collaborator'
+        assert request_user.is_staff is False
+
+    def test_rejects_token_of_inactive_user(self):
+        """Testa que tokens com a claim is_active falsa são rejeitados"""
+        from rest_framework.exceptions import AuthenticationFailed
+        refresh = RefreshToken.for_user(UserFactory())
+        refresh['is_active'] = False
+        token = str(refresh.access_token)
+
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_db_revocation_check(self, settings, django_assert_num_queries):
+        """Testa que a verificação 'db' rejeita usuários desativados após a emissão"""
+        from rest_framework.exceptions import AuthenticationFailed
+        settings.JWT_REVOCATION_CHECK = 'db'
+        user = UserFactory()
+        token = str(RefreshToken.for_user(user).access_token)
+        with django_assert_num_queries(1):
+            self.authenticate(token)
+
+        user.is_active = False
+        user.save()
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_version_check_is_cached(self, django_assert_num_queries):
+        """Testa que a verificação de versão consulta o banco uma única vez"""
+        token = str(RefreshToken.for_user(UserFactory()).access_token)
+        with django_assert_num_queries(1):
+            self.authenticate(token)
+        with django_assert_num_queries(0):
+            self.authenticate(token)
+
+    def test_revoke_tokens_rejects_previous_tokens(self):
+        """Testa que revoke_tokens invalida os tokens já emitidos"""
+        from rest_framework.exceptions import AuthenticationFailed
+        from core.models import User
+        user = UserFactory()
+        token = str(RefreshToken.for_user(user).access_token)
+        self.authenticate(token)
+
+        User.objects.revoke_tokens(user.pk)
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate(token)
+        user.refresh_from_db()
+        assert self.authenticate(str(RefreshToken.for_user(user).access_token))
+
+
+@pytest.mark.django_db
+class TestConsumeRefreshToken:
+    """Testes para consume_refresh_token"""
+
+    def test_token_is_consumed_once(self):
+        """Testa que o mesmo jti só pode ser consumido uma vez"""
+        token = RefreshToken.for_user(UserFactory())
+
+        assert consume_refresh_token(token) is True
+        assert consume_refresh_token(token) is False
+        token.set_jti()
+        assert consume_refresh_token(token) is True
+
+    def test_entry_expires_with_token(self, monkeypatch):
+        """Testa que o jti é descartado quando o token expira"""
+        token = RefreshToken.for_user(UserFactory())
+        token.set_exp(lifetime=timedelta(seconds=60))
+        now = time.time()
+        consume_refresh_token(token)
+
+        monkeypatch.setattr(time, 'time', lambda: now + 61)
+
+        assert not refresh_token_cache().has_key(f"refresh:{token['jti']}")
+
+
+@pytest.fixture
+def database_refresh_cache(settings):
+    settings.CACHES = {
+        **settings.CACHES,
+        'refresh_tokens': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'refresh_tokens',
+        },
+    }
+    call_command('createcachetable')
+
+
+@pytest.mark.django_db
+class TestCheckRefreshTokenCache:
+    """Testes para check_refresh_token_cache"""
+
+    def test_rejects_process_cache_with_workers(self):
+        """Testa que o cache local ao processo é recusado com vários workers"""
+        with pytest.raises(ImproperlyConfigured, match='3 workers'):
+            check_refresh_token_cache(3)
+
+        check_refresh_token_cache(1)
+
+    def test_accepts_process_cache_without_rotation(self, settings):
+        """Testa que sem rotação o cache não é usado e não há o que recusar"""
+        settings.SIMPLE_JWT = {**settings.SIMPLE_JWT, 'ROTATE_REFRESH_TOKENS': False}
+        check_refresh_token_cache(3)
+
+    def test_accepts_database_cache(self, database_refresh_cache):
+        """Testa que o DatabaseCache é aceito e detecta o reuso"""
+        check_refresh_token_cache(3)
+        token = RefreshToken.for_user(UserFactory())
+
+        assert consume_refresh_token(token) is True
+        assert consume_refresh_token(token) is False
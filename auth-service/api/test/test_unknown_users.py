@@ -0,0 +1,138 @@
+import pytest
+from unittest.mock import patch
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from api.unknown_users import BloomFilter, KnownEmailFilter, UnknownUserPath, get_known_email_filter
+from core.factories import UserFactory
+
+
+class TestBloomFilter:
+    """Testes para BloomFilter"""
+
+    def test_has_no_false_negatives(self):
+        """Testa que todo item adicionado é encontrado"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f'user{i}@example.com' for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+
+    def test_false_positive_rate(self):
+        """Testa que a taxa de falsos positivos fica perto da configurada"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'user{i}@example.com')
+
+        false_positives = sum(f'other{i}@example.com' in bloom for i in range(10000))
+        assert false_positives < 300
+
+
+@pytest.mark.django_db
+class TestKnownEmailFilter:
+    """Testes para KnownEmailFilter"""
+
+    def test_built_from_database(self):
+        """Testa que o filtro é construído a partir dos usuários cadastrados"""
+        UserFactory(email='user@example.com')
+        email_filter = KnownEmailFilter(error_rate=0.01, rebuild_interval=300)
+
+        assert email_filter.might_contain('user@example.com')
+        assert not email_filter.might_contain('unknown@example.com')
+
+    def test_updated_on_save(self, settings):
+        """Testa que usuários salvos entram no filtro sem reconstrução"""
+        settings.LOGIN_UNKNOWN_USER = {**settings.LOGIN_UNKNOWN_USER, 'EMAIL_FILTER': True}
+        email_filter = get_known_email_filter()
+        assert not email_filter.might_contain('new@example.com')
+
+        UserFactory(email='new@example.com')
+        assert email_filter.might_contain('new@example.com')
+
+
+    def test_stale_filter_is_served_while_another_thread_rebuilds(self, django_assert_num_queries):
+        """Testa que só uma thread reconstrói; as demais usam o filtro antigo"""
+        UserFactory(email='user@example.com')
+        email_filter = KnownEmailFilter(error_rate=0.01, rebuild_interval=300)
+        email_filter.rebuild()
+        email_filter._built_at -= 300
+
+        with email_filter._rebuild_lock, django_assert_num_queries(0):
+            assert email_filter.might_contain('user@example.com')
+            assert not email_filter.might_contain('unknown@example.com')
+        assert email_filter.is_stale()
+
+    def test_unbuilt_filter_defers_to_database(self, django_assert_num_queries):
+        """Testa que, antes da primeira construção, nenhum e-mail é recusado"""
+        email_filter = KnownEmailFilter(error_rate=0.01, rebuild_interval=300)
+
+        with email_filter._rebuild_lock, django_assert_num_queries(0):
+            assert email_filter.might_contain('unknown@example.com')
+
+
+class TestUnknownUserPath:
+    """Testes para UnknownUserPath"""
+
+    def test_sleep_strategy_waits_estimated_cost(self):
+        """Testa que a estratégia 'sleep' espera o custo estimado sem calcular hash"""
+        path = UnknownUserPath('sleep', max_delay=1.0)
+        path.encoded, path.cost = 'precomputed', 0.2
+
+        with patch('api.unknown_users.time.sleep') as sleep, \
+                patch('api.unknown_users.check_password') as check_password:
+            path.run('password')
+
+        sleep.assert_called_once_with(0.2)
+        check_password.assert_not_called()
+
+    def test_delay_is_capped_by_budget(self):
+        """Testa que a espera não passa de max_delay"""
+        path = UnknownUserPath('sleep', max_delay=0.1)
+        path.cost = 0.5
+        assert path.delay() == 0.1
+
+    def test_observe_tracks_real_checks(self):
+        """Testa que o custo estimado acompanha as verificações reais"""
+        path = UnknownUserPath('sleep', max_delay=1.0)
+        path.cost = 0.1
+        path.observe(0.2)
+        assert path.cost == pytest.approx(0.11)
+
+    def test_hash_strategy_checks_dummy_hash(self):
+        """Testa que a estratégia 'hash' verifica a senha contra o hash fictício"""
+        path = UnknownUserPath('hash', max_delay=1.0)
+        path.encoded, path.cost = 'precomputed', 0.2
+
+        with patch('api.unknown_users.check_password') as check_password:
+            path.run('password')
+
+        check_password.assert_called_once_with('password', 'precomputed')
+
+
+@pytest.mark.django_db
+class TestUnknownUserLogin:
+    """Testes do login com e-mail desconhecido"""
+
+    def test_unknown_email_skips_database_with_filter(self, settings, django_assert_num_queries):
+        """Testa que, com o filtro ligado, e-mail desconhecido não consulta o banco"""
+        settings.LOGIN_UNKNOWN_USER = {**settings.LOGIN_UNKNOWN_USER, 'STRATEGY': 'none', 'EMAIL_FILTER': True}
+        UserFactory(email='user@example.com')
+        get_known_email_filter().rebuild()
+        client = APIClient()
+
+        with django_assert_num_queries(0):
+            response = client.post(reverse('login'), {'email': 'unknown@example.com', 'password': 'x'}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = client.post(reverse('login'), {'email': 'user@example.com', 'password': 'testpass123'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_unknown_email_runs_unknown_user_path(self, settings):
+        """Testa que e-mail desconhecido passa pelo caminho de tempo constante"""
+        settings.LOGIN_UNKNOWN_USER = {**settings.LOGIN_UNKNOWN_USER, 'STRATEGY': 'sleep'}
+        with patch.object(UnknownUserPath, 'run') as run:
+            response = APIClient().post(reverse('login'), {'email': 'unknown@example.com', 'password': 'x'}, format='json')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        run.assert_called_once_with('x')
@@ -0,0 +1,151 @@
+import time
+from functools import lru_cache
+import jwt
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt import settings as simplejwt_settings
+from core.cache import LRUCache
+from .keys import get_signing_keys
+
+# Claim com o token_version do usuário no momento da emissão
+TOKEN_VERSION_CLAIM = 'ver'
+
+
+class KeyedTokenBackend(TokenBackend):
+    """
+    TokenBackend que assina com a chave ativa e identifica a chave pelo
+    ``kid`` no cabeçalho do JWT; na verificação, a chave pública é escolhida
+    pelo ``kid`` do token.
+    """
+
+    def __init__(self, keys):
+        jwt_settings = simplejwt_settings.api_settings
+        super().__init__(
+            keys.algorithm,
+            audience=jwt_settings.AUDIENCE,
+            issuer=jwt_settings.ISSUER,
+            leeway=jwt_settings.LEEWAY,
+            json_encoder=jwt_settings.JSON_ENCODER,
+        )
+        self.keys = keys
+
+    def encode(self, payload):
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload['aud'] = self.audience
+        if self.issuer is not None:
+            jwt_payload['iss'] = self.issuer
+        return jwt.encode(
+            jwt_payload,
+            self.keys.signing_key,
+            algorithm=self.algorithm,
+            headers={'kid': self.keys.active_kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def get_verifying_key(self, token):
+        try:
+            kid = jwt.get_unverified_header(token).get('kid')
+        except jwt.InvalidTokenError as e:
+            raise TokenBackendError(_('Token is invalid')) from e
+        key = self.keys.get_verifying_key(kid)
+        if key is None:
+            raise TokenBackendError(_('Token is invalid'))
+        return key
+
+
+@lru_cache(maxsize=None)
+def get_token_backend():
+    keys = get_signing_keys()
+    if keys is None:
+        # simplejwt recria api_settings quando SIMPLE_JWT muda; por isso a
+        # configuração é lida do módulo a cada construção.
+        jwt_settings = simplejwt_settings.api_settings
+        return TokenBackend(
+            jwt_settings.ALGORITHM,
+            jwt_settings.SIGNING_KEY,
+            jwt_settings.VERIFYING_KEY,
+            jwt_settings.AUDIENCE,
+            jwt_settings.ISSUER,
+            jwt_settings.JWK_URL,
+            jwt_settings.LEEWAY,
+            jwt_settings.JSON_ENCODER,
+        )
+    return KeyedTokenBackend(keys)
+
+
+@receiver(setting_changed)
+def reset_token_backend(*, setting, **kwargs):
+    if setting in ('SIMPLE_JWT', 'JWT_SIGNING'):
+        get_signing_keys.cache_clear()
+        get_token_backend.cache_clear()
+
+
+class TokenBackendMixin:
+    def get_token_backend(self):
+        return get_token_backend()
+
+
+class AccessToken(TokenBackendMixin, tokens.AccessToken):
+    pass
+
+
+class RefreshToken(TokenBackendMixin, tokens.RefreshToken):
+    """
+    Refresh token que carrega ``role``, ``is_staff``, ``is_active`` e o
+    ``token_version`` como claims; o access token derivado herda as mesmas
+    claims.
+    """
+    access_token_class = AccessToken
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['role'] = user.role
+        token['is_staff'] = user.is_staff
+        token['is_active'] = user.is_active
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+def refresh_token_cache():
+    """
+    Cache com os jti dos refresh tokens já trocados
+    (REFRESH_TOKEN_CACHE_ALIAS).
+    """
+    return caches[settings.REFRESH_TOKEN_CACHE_ALIAS]
+
+
+def check_refresh_token_cache(workers):
+    """
+    Recusa um cache de refresh tokens guardado na memória do processo
+    quando há rotação e mais de um worker: um token trocado num worker e
+    reapresentado a outro não seria detectado como reuso.
+    """
+    if workers <= 1 or not simplejwt_settings.api_settings.ROTATE_REFRESH_TOKENS:
+        return
+    if isinstance(refresh_token_cache(), (LocMemCache, LRUCache)):
+        raise ImproperlyConfigured(
+            f"REFRESH_TOKEN_CACHE_BACKEND guarda os refresh tokens trocados em cada processo, "
+            f"mas há {workers} workers: use um backend compartilhado (ex.: "
+            f"django.core.cache.backends.db.DatabaseCache ou RedisCache), WEB_CONCURRENCY=1 "
+            f"ou JWT_ROTATE_REFRESH_TOKENS=False."
+        )
+
+
+def consume_refresh_token(token):
+    """
+    Marca o refresh token como usado até a sua expiração, quando ele deixa
+    de ser aceito de qualquer forma. Retorna ``False`` se ele já tinha sido
+    usado.
+    """
+    timeout = max(1, token['exp'] - int(time.time()))
+    return refresh_token_cache().add(f"refresh:{token['jti']}", True, timeout=timeout)
@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import math
+import threading
+import time
+from functools import lru_cache
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.crypto import get_random_string
+from core.models import User
+from .hashing import HashPoolSaturated, get_hash_pool
+
+
+class BloomFilter:
+    """
+    Conjunto probabilístico: ``item in filtro`` nunca dá falso negativo e dá
+    falso positivo com probabilidade próxima de ``error_rate`` enquanto o
+    número de itens não passar de ``capacity``.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def _positions(self, item):
+        # Double hashing: k posições a partir de dois hashes de 64 bits
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+
+class KnownEmailFilter:
+    """
+    Filtro de Bloom com os e-mails cadastrados, para responder a tentativas
+    de login com e-mail desconhecido sem consultar o banco.
+
+    É reconstruído a partir de User a cada ``rebuild_interval`` segundos e
+    atualizado a cada save() neste processo. Usuários criados por outro
+    processo só entram na próxima reconstrução; até lá o login deles é
+    recusado, por isso o filtro vem desligado por padrão.
+
+    A reconstrução lê a tabela inteira, então só uma thread por processo a
+    faz de cada vez; as demais seguem respondendo com o filtro anterior e,
+    antes da primeira construção, tratam todo e-mail como possivelmente
+    cadastrado (o login segue para o banco).
+    """
+
+    def __init__(self, error_rate, rebuild_interval):
+        self.error_rate = error_rate
+        self.rebuild_interval = rebuild_interval
+        self._bloom = None
+        self._built_at = None
+        self._pending = None
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+
+    def is_stale(self):
+        return self._built_at is None or time.monotonic() - self._built_at >= self.rebuild_interval
+
+    def rebuild(self):
+        with self._rebuild_lock:
+            self._build()
+
+    def _build(self):
+        with self._lock:
+            self._pending = []
+        # Folga para os cadastros feitos até a próxima reconstrução
+        bloom = BloomFilter(max(User.objects.count() * 2, 1024), self.error_rate)
+        for email in User.objects.values_list('email__lower', flat=True).iterator(chunk_size=5000):
+            bloom.add(email)
+        with self._lock:
+            # Repõe os e-mails salvos enquanto o banco era lido
+            for email in self._pending:
+                bloom.add(email)
+            self._pending = None
+            self._bloom = bloom
+            self._built_at = time.monotonic()
+
+    def might_contain(self, email):
+        if self.is_stale() and self._rebuild_lock.acquire(blocking=False):
+            try:
+                self._build()
+            finally:
+                self._rebuild_lock.release()
+        return self._contains(email)
+
+    async def amight_contain(self, email):
+        if self.is_stale() and self._rebuild_lock.acquire(blocking=False):
+            try:
+                await sync_to_async(self._build)()
+            finally:
+                self._rebuild_lock.release()
+        return self._contains(email)
+
+    def _contains(self, email):
+        bloom = self._bloom
+        return bloom is None or User.objects.normalize_email(email) in bloom
+
+    def add(self, email):
+        email = User.objects.normalize_email(email)
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(email)
+            if self._bloom is not None:
+                self._bloom.add(email)
+
+
+class UnknownUserPath:
+    """
+    Iguala o tempo de resposta do login com e-mail desconhecido ao de uma
+    verificação de senha real.
+
+    Estratégias:
+
+    - ``'hash'``: verifica a senha contra um hash fictício pré-calculado, com
+      o mesmo custo de CPU de um usuário existente;
+    - ``'sleep'``: apenas espera o custo estimado de uma verificação, sem
+      gastar CPU;
+    - ``'none'``: responde imediatamente.
+
+    O custo estimado começa com o tempo do cálculo do hash fictício e segue
+    a média móvel das verificações reais (``observe``), limitado a
+    ``max_delay`` segundos.
+    """
+
+    def __init__(self, strategy, max_delay):
+        if strategy not in ('hash', 'sleep', 'none'):
+            raise ImproperlyConfigured(
+                f"LOGIN_UNKNOWN_USER['STRATEGY'] inválido: {strategy!r}"
+            )
+        self.strategy = strategy
+        self.max_delay = max_delay
+        self.encoded = None
+        self.cost = None
+
+    def prepare(self):
+        if self.encoded is None:
+            start = time.perf_counter()
+            encoded = make_password(get_random_string(32))
+            self.cost = time.perf_counter() - start
+            self.encoded = encoded
+
+    def observe(self, seconds):
+        if self.cost is None:
+            self.cost = seconds
+        else:
+            self.cost = 0.9 * self.cost + 0.1 * seconds
+
+    def delay(self):
+        return min(self.cost, self.max_delay)
+
+    def run(self, password):
+        if self.strategy == 'none':
+            return
+        self.prepare()
+        if self.strategy == 'hash':
+            check_password(password, self.encoded)
+        else:
+            time.sleep(self.delay())
+
+    async def arun(self, password):
+        if self.strategy == 'none':
+            return
+        if self.encoded is None:
+            await sync_to_async(self.prepare)()
+        if self.strategy == 'hash':
+            try:
+                await get_hash_pool().check_password(password, self.encoded)
+                return
+            except HashPoolSaturated:
+                pass
+        await asyncio.sleep(self.delay())
+
+
+@lru_cache(maxsize=None)
+def get_known_email_filter():
+    """
+    Retorna o filtro de e-mails cadastrados do processo, ou ``None`` se
+    LOGIN_UNKNOWN_USER['EMAIL_FILTER'] estiver desligado.
+    """
+    config = settings.LOGIN_UNKNOWN_USER
+    if not config['EMAIL_FILTER']:
+        return None
+    return KnownEmailFilter(config['FILTER_ERROR_RATE'], config['FILTER_REBUILD_INTERVAL'])
+
+
+@lru_cache(maxsize=None)
+def get_unknown_user_path():
+    config = settings.LOGIN_UNKNOWN_USER
+    return UnknownUserPath(config['STRATEGY'], config['MAX_DELAY'])
+
+
+def remember_emails(emails):
+    """
+    Inclui no filtro e-mails cadastrados sem passar por save() (ex.:
+    bulk_create).
+    """
+    email_filter = get_known_email_filter()
+    if email_filter is not None:
+        for email in emails:
+            email_filter.add(email)
+
+
+@receiver(setting_changed)
+def reset_unknown_user_path(*, setting, **kwargs):
+    if setting == 'LOGIN_UNKNOWN_USER':
+        get_known_email_filter.cache_clear()
+        get_unknown_user_path.cache_clear()
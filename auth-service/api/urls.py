@@ -1,9 +1,23 @@
-from .views import RegisterView, LoginView, UserListAPIView, UserRetrieveAPIView
+from .views import (
+    RegisterView, BulkRegisterView, LoginView, AsyncLoginView, LogoutAllView, PasswordChangeView,
+    IntrospectView, TokenRefreshView, UserBatchLookupView, UserStatsView, UserListAPIView, UserRetrieveAPIView,
+    AsyncUserListView, AsyncUserRetrieveView,
+)
 from django.urls import path
 
 urlpatterns = [
     path('auth/register/', RegisterView.as_view(), name='user-register'),
+    path('auth/register/bulk/', BulkRegisterView.as_view(), name='user-register-bulk'),
     path('auth/login/', LoginView.as_view(), name='login'),
+    path('auth/async/login/', AsyncLoginView.as_view(), name='login-async'),
+    path('auth/token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+    path('auth/logout/all/', LogoutAllView.as_view(), name='logout-all'),
+    path('auth/password/change/', PasswordChangeView.as_view(), name='password-change'),
+    path('auth/introspect/', IntrospectView.as_view(), name='introspect'),
+    path('auth/stats/', UserStatsView.as_view(), name='user-stats'),
     path('auth/user/', UserListAPIView.as_view(), name='users'),
+    path('auth/user/batch/', UserBatchLookupView.as_view(), name='user-batch'),
     path('auth/user/<uuid:pk>/', UserRetrieveAPIView.as_view(), name='user'),
+    path('auth/async/user/', AsyncUserListView.as_view(), name='users-async'),
+    path('auth/async/user/<uuid:pk>/', AsyncUserRetrieveView.as_view(), name='user-async'),
 ]
\ No newline at end of file
@@ -1,37 +1,504 @@
-from .serializers import RegisterSerializer, LoginSerializer, UserSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+import time
+from collections.abc import Iterator
+from .serializers import RegisterSerializer, LoginSerializer, LoginCredentialsSerializer, UserSerializer, UserValuesSerializer, UserBatchLookupSerializer, BulkUserSerializer, IntrospectionSerializer, PasswordChangeSerializer, TokenRefreshSerializer
+from .authentication import ClaimsJWTAuthentication
+from .cache import aget_user_entry, etag_matches, get_user_entries, get_user_entry
+from .hashing import HashPoolSaturated, get_hash_pool
+from .importer import UserImporter
+from .introspection import introspect_token, introspect_tokens
+from .keys import get_signing_keys
+from .tokens import RefreshToken
+from .pagination import UserKeysetPagination
+from .ratelimit import get_client_ip, get_login_email, get_login_rate_limiter
+from .parsers import CSVParser, NDJSONParser
+from .renderers import NDJSONRenderer
+from .unknown_users import get_known_email_filter, get_unknown_user_path
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework import generics
+from rest_framework import generics, serializers
 from rest_framework import status
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import BasePermission, IsAdminUser, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from drf_spectacular.utils import extend_schema, extend_schema_view, inline_serializer
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from core.hashers import must_upgrade
+from core.metrics import stage_timer
 from core.models import User
+from core.stats import get_user_stats
 
-class UserListAPIView(generics.ListAPIView):
-    queryset = User.objects.all()
-    serializer_class = UserSerializer
+class RenderTimingMixin:
+    """
+    Renderiza a resposta ainda na view para medir a etapa ``render`` de
+    ``metrics_endpoint``; sem isso a renderização ficaria para o handler.
+    """
+    metrics_endpoint = None
 
-class UserRetrieveAPIView(generics.RetrieveAPIView):
-    queryset = User.objects.all()
-    serializer_class = UserSerializer
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if isinstance(response, Response):
+            with stage_timer(self.metrics_endpoint, 'render'):
+                response.render()
+        return response
+
+@extend_schema_view(get=extend_schema(responses=UserSerializer(many=True)))
+class UserListAPIView(RenderTimingMixin, generics.ListAPIView):
+    """
+    Lista usuários paginados por cursor em ``(role, user_id)``.
+
+    Com ``?format=ndjson`` (ou ``Accept: application/x-ndjson``) a listagem
+    completa é exportada em streaming, lendo o banco em blocos de
+    ``STREAM_CHUNK_SIZE`` registros com memória constante.
+    """
+    queryset = User.objects.values(*UserValuesSerializer.field_names)
+    serializer_class = UserValuesSerializer
+    pagination_class = UserKeysetPagination
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+    metrics_endpoint = 'users'
+
+    def list(self, request, *args, **kwargs):
+        if isinstance(request.accepted_renderer, NDJSONRenderer):
+            return self.stream(self.filter_queryset(self.get_queryset()))
+        with stage_timer(self.metrics_endpoint, 'query'):
+            return super().list(request, *args, **kwargs)
+
+    def stream(self, queryset):
+        queryset = queryset.order_by(*self.pagination_class.ordering)
+        chunk_size = settings.USER_LIST_PAGINATION['STREAM_CHUNK_SIZE']
+        serializer = self.get_serializer()
+        renderer = NDJSONRenderer()
+        lines = (
+            renderer.render_line(serializer.to_representation(row))
+            for row in queryset.iterator(chunk_size=chunk_size)
+        )
+        return StreamingHttpResponse(lines, content_type=renderer.media_type)
+
+@extend_schema_view(get=extend_schema(responses=UserSerializer))
+class UserRetrieveAPIView(RenderTimingMixin, generics.RetrieveAPIView):
+    """
+    Retorna um usuário a partir do cache de leitura (USER_CACHE_ALIAS).
+
+    A resposta traz um ETag; com ``If-None-Match`` correspondente, responde
+    304 sem corpo.
+    """
+    queryset = User.objects.values(*UserValuesSerializer.field_names)
+    serializer_class = UserValuesSerializer
+    metrics_endpoint = 'user'
+
+    def retrieve(self, request, *args, **kwargs):
+        with stage_timer(self.metrics_endpoint, 'lookup'):
+            entry = get_user_entry(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        if entry is None:
+            raise Http404
+        if etag_matches(request, entry.etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': entry.etag})
+        return Response(entry.data, headers={'ETag': entry.etag})
+
+class UserBatchLookupView(RenderTimingMixin, generics.GenericAPIView):
+    """
+    Busca vários usuários de uma vez, por ``ids`` e/ou ``emails``, com até
+    USER_BATCH_LOOKUP['MAX_ITEMS'] itens no total.
 
-class RegisterView(generics.CreateAPIView):
+    ``results`` segue a ordem pedida, sem repetições (os encontrados por ID
+    antes dos encontrados por e-mail); ``missing`` lista o que não existe.
+    """
+    serializer_class = UserBatchLookupSerializer
+    metrics_endpoint = 'user-batch'
+
+    @extend_schema(responses=UserSerializer(many=True))
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data.get('ids', ())))
+        emails = list(dict.fromkeys(serializer.validated_data.get('emails', ())))
+        with stage_timer(self.metrics_endpoint, 'lookup'):
+            by_id, by_email = get_user_entries(ids, emails)
+
+        results, seen = [], set()
+        for entry in [by_id.get(user_id) for user_id in ids] + [by_email.get(email.lower()) for email in emails]:
+            if entry is not None and entry.data['user_id'] not in seen:
+                seen.add(entry.data['user_id'])
+                results.append(entry.data)
+        return Response({
+            'results': results,
+            'missing': {
+                'ids': [user_id for user_id in ids if user_id not in by_id],
+                'emails': [email for email in emails if email.lower() not in by_email],
+            },
+        })
+
+class RegisterView(RenderTimingMixin, generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
+    metrics_endpoint = 'user-register'
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        with stage_timer(self.metrics_endpoint, 'validate'):
+            serializer.is_valid(raise_exception=True)
+        with stage_timer(self.metrics_endpoint, 'create'):
+            self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
+class BulkRegisterView(APIView):
+    """
+    Cadastro em lote para administradores.
+
+    Aceita uma lista JSON, CSV (``text/csv``, com cabeçalho email,role,password)
+    ou NDJSON (``application/x-ndjson``); CSV e NDJSON são lidos em streaming.
+    Responde com o total criado e os erros de cada linha rejeitada.
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [JSONParser, CSVParser, NDJSONParser]
+
+    @extend_schema(
+        request=BulkUserSerializer(many=True),
+        responses=inline_serializer('BulkRegisterResult', fields={
+            'created': serializers.IntegerField(),
+            'errors': serializers.ListField(child=inline_serializer('BulkRegisterError', fields={
+                'line': serializers.IntegerField(),
+                'email': serializers.CharField(allow_null=True),
+                'errors': serializers.DictField(),
+            })),
+        }),
+    )
+    def post(self, request):
+        rows = request.data
+        # Lista JSON ou as linhas lidas em streaming pelos parsers de CSV e
+        # NDJSON; objetos e valores escalares são recusados
+        if not isinstance(rows, (list, Iterator)):
+            return Response({
+                "detail": "Envie uma lista de usuários."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return Response(UserImporter().run(rows), status=status.HTTP_200_OK)
+
+class UserStatsView(APIView):
+    """
+    Totais de usuários por role e situação, para administradores. Lidos da
+    tabela UserCount, sem contar a tabela User.
+    """
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(responses=inline_serializer('UserStats', fields={
+        'total': serializers.IntegerField(),
+        'active': serializers.IntegerField(),
+        'inactive': serializers.IntegerField(),
+        'roles': serializers.DictField(child=inline_serializer('UserStatsByRole', fields={
+            'active': serializers.IntegerField(),
+            'inactive': serializers.IntegerField(),
+            'total': serializers.IntegerField(),
+        })),
+    }))
+    def get(self, request):
+        return Response(get_user_stats())
+
+TOO_MANY_ATTEMPTS_DETAIL = "Muitas tentativas de login. Tente novamente mais tarde."
+
+class LoginView(RenderTimingMixin, APIView):
+    metrics_endpoint = 'login'
 
-class LoginView(APIView):
-    
     def post(self, request):
+        limiter = get_login_rate_limiter()
+        ip = get_client_ip(request)
+        email = get_login_email(request.data)
+        with stage_timer(self.metrics_endpoint, 'rate_limit'):
+            retry_after = limiter.check(ip, email)
+        if retry_after is not None:
+            return Response(
+                {"detail": TOO_MANY_ATTEMPTS_DETAIL},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={'Retry-After': str(retry_after)},
+            )
+
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
+            limiter.record_success(ip, email)
             user = serializer.validated_data['user']
+            with stage_timer(self.metrics_endpoint, 'tokens'):
+                refresh = RefreshToken.for_user(user)
+                tokens = {
+                    "refresh": str(refresh),
+                    "access": str(refresh.access_token),
+                }
+            return Response(tokens, status=status.HTTP_200_OK)
+
+        limiter.record_failure(ip, email)
+        return Response({
+            "detail": "Credenciais inválidas."
+        }, status=status.HTTP_401_UNAUTHORIZED)
+
+class TokenRefreshView(RenderTimingMixin, generics.GenericAPIView):
+    """
+    Renova o access token a partir de um refresh token, sem hash de senha.
+    Com rotação, a resposta traz também o novo refresh token.
+    """
+    authentication_classes = []
+    serializer_class = TokenRefreshSerializer
+    metrics_endpoint = 'token-refresh'
+
+    def get_authenticate_header(self, request):
+        # Token inválido responde 401, e não 403, mesmo sem autenticação na view
+        return 'Bearer realm="api"'
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.validated_data, status=status.HTTP_200_OK)
+
+class LogoutAllView(APIView):
+    """
+    Revoga todos os tokens do usuário autenticado (logout em todos os
+    dispositivos).
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(request=None, responses={status.HTTP_204_NO_CONTENT: None})
+    def post(self, request):
+        User.objects.revoke_tokens(request.user.id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class PasswordChangeView(generics.GenericAPIView):
+    """
+    Troca a senha do usuário autenticado e revoga os tokens anteriores.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = PasswordChangeSerializer
+
+    def post(self, request):
+        user = generics.get_object_or_404(User, pk=request.user.id)
+        serializer = self.get_serializer(user, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class JWKSView(APIView):
+    """
+    Publica as chaves públicas de verificação dos tokens (JWK Set).
+
+    A resposta pode ser cacheada pelos consumidores por JWKS_MAX_AGE
+    segundos; com assinatura HS* a lista de chaves é vazia.
+    """
+    authentication_classes = []
+    permission_classes = []
+    renderer_classes = [JSONRenderer]
+
+    @extend_schema(responses=inline_serializer('JWKSet', fields={
+        # Os campos de cada JWK dependem do tipo da chave (RFC 7517)
+        'keys': serializers.ListField(child=serializers.DictField()),
+    }))
+    def get(self, request):
+        keys = get_signing_keys()
+        return Response(
+            keys.jwks() if keys is not None else {'keys': []},
+            headers={'Cache-Control': f'public, max-age={settings.JWKS_MAX_AGE}'},
+        )
+
+class HasIntrospectionToken(BasePermission):
+    """
+    Aceita ``Authorization: Bearer <TOKEN_INTROSPECTION_CLIENT_TOKEN>``, a
+    credencial dos serviços que consultam a introspecção.
+    """
+
+    def has_permission(self, request, view):
+        token = settings.TOKEN_INTROSPECTION_CLIENT_TOKEN
+        return bool(token) and constant_time_compare(
+            request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+        )
+
+class IntrospectView(generics.GenericAPIView):
+    """
+    Introspecção de tokens de acesso (RFC 7662).
+
+    Aceita ``{"token": ...}`` ou, para gateways, ``{"tokens": [...]}`` com até
+    TOKEN_INTROSPECTION_MAX_BATCH tokens, respondidos na mesma ordem.
+
+    Só responde a quem apresenta a credencial de cliente
+    (TOKEN_INTROSPECTION_CLIENT_TOKEN) ou a um administrador. A credencial é
+    verificada primeiro, sem tentar lê-la como JWT.
+    """
+    serializer_class = IntrospectionSerializer
+    permission_classes = [HasIntrospectionToken | IsAdminUser]
+
+    def perform_authentication(self, request):
+        # Autenticação preguiçosa: o JWT só é lido se IsAdminUser precisar
+        pass
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if 'token' in serializer.validated_data:
+            return Response(introspect_token(serializer.validated_data['token']))
+        return Response({
+            'results': introspect_tokens(serializer.validated_data['tokens']),
+        })
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncLoginView(View):
+    """
+    Login assíncrono para execução via ASGI.
+
+    A busca do usuário e a emissão dos tokens rodam no event loop; apenas a
+    verificação da senha vai para o pool de hashing. Com o pool cheio, a
+    requisição é recusada com 503 e Retry-After.
+    """
+    metrics_endpoint = 'login-async'
+
+    async def post(self, request):
+        # Mesmos parsers e respostas de erro (400/415) do LoginView
+        try:
+            data = Request(request, parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES]).data
+        except APIException as exc:
+            return JsonResponse({"detail": exc.detail}, status=exc.status_code)
+
+        limiter = get_login_rate_limiter()
+        ip = get_client_ip(request)
+        email = get_login_email(data)
+        with stage_timer(self.metrics_endpoint, 'rate_limit'):
+            retry_after = await limiter.acheck(ip, email)
+        if retry_after is not None:
+            response = JsonResponse({"detail": TOO_MANY_ATTEMPTS_DETAIL}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+            response['Retry-After'] = str(retry_after)
+            return response
+
+        serializer = LoginCredentialsSerializer(data=data)
+        if not serializer.is_valid():
+            await limiter.arecord_failure(ip, email)
+            return self._invalid_credentials()
+
+        email = serializer.validated_data['email']
+        password = serializer.validated_data['password']
+
+        user = None
+        email_filter = get_known_email_filter()
+        with stage_timer(self.metrics_endpoint, 'lookup'):
+            if email_filter is None or await email_filter.amight_contain(email):
+                user = await User.objects.by_email(email).afirst()
+
+        unknown_user_path = get_unknown_user_path()
+        if user is None:
+            with stage_timer(self.metrics_endpoint, 'unknown_user'):
+                await unknown_user_path.arun(password)
+            await limiter.arecord_failure(ip, email)
+            return self._invalid_credentials()
+
+        try:
+            with stage_timer(self.metrics_endpoint, 'check_password'):
+                start = time.perf_counter()
+                valid = await get_hash_pool().check_password(password, user.password)
+                unknown_user_path.observe(time.perf_counter() - start)
+        except HashPoolSaturated:
+            response = JsonResponse({
+                "detail": "Serviço sobrecarregado, tente novamente."
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = str(settings.LOGIN_HASH_POOL['RETRY_AFTER'])
+            return response
+
+        if not valid:
+            await limiter.arecord_failure(ip, email)
+            return self._invalid_credentials()
+
+        await limiter.arecord_success(ip, email)
+        await self._upgrade_password(user, password)
+        with stage_timer(self.metrics_endpoint, 'tokens'):
             refresh = RefreshToken.for_user(user)
-            
-            return Response({
+            tokens = {
                 "refresh": str(refresh),
                 "access": str(refresh.access_token),
-            }, status=status.HTTP_200_OK)
+            }
+        with stage_timer(self.metrics_endpoint, 'render'):
+            return JsonResponse(tokens, status=status.HTTP_200_OK)
 
-        return Response({
+    async def _upgrade_password(self, user, password):
+        """
+        Refaz o hash com o perfil atual, como ``User.check_password`` faz no
+        login síncrono. Com o pool cheio, a atualização fica para o próximo
+        login.
+        """
+        if not must_upgrade(user.password):
+            return
+        try:
+            user.password = await get_hash_pool().make_password(password)
+        except HashPoolSaturated:
+            return
+        await user.asave(update_fields=['password'])
+
+    def _invalid_credentials(self):
+        return JsonResponse({
             "detail": "Credenciais inválidas."
         }, status=status.HTTP_401_UNAUTHORIZED)
-        
\ No newline at end of file
+
+class AsyncAPIView(View):
+    """
+    Base das views assíncronas para ASGI.
+
+    A autenticação JWT, a leitura da requisição (``Request`` do DRF) e a
+    renderização com o JSONRenderer rodam no event loop e o banco é lido
+    pelo ORM assíncrono, sem as trocas de thread de uma view síncrona sob
+    ASGI. Responde apenas JSON, sem a API navegável.
+    """
+    metrics_endpoint = None
+    renderer = JSONRenderer()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Como no APIView: autenticação por token, sem sessão nem CSRF
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request, parsers=[JSONParser()])
+        try:
+            result = await ClaimsJWTAuthentication().aauthenticate(request)
+            request.user, request.auth = result if result is not None else (AnonymousUser(), None)
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            headers = {}
+            if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+                headers['WWW-Authenticate'] = 'Bearer realm="api"'
+            return self.render(data, status_code=exc.status_code, headers=headers)
+
+    def render(self, data, status_code=status.HTTP_200_OK, headers=None):
+        with stage_timer(self.metrics_endpoint, 'render'):
+            content = self.renderer.render(data)
+        return HttpResponse(content, status=status_code, headers=headers, content_type=self.renderer.media_type)
+
+class AsyncUserRetrieveView(AsyncAPIView):
+    """
+    Versão assíncrona de UserRetrieveAPIView, com o mesmo cache de leitura e
+    ETag.
+    """
+    metrics_endpoint = 'user-async'
+
+    async def get(self, request, pk):
+        with stage_timer(self.metrics_endpoint, 'lookup'):
+            entry = await aget_user_entry(pk)
+        if entry is None:
+            raise NotFound()
+        if etag_matches(request, entry.etag):
+            return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': entry.etag})
+        return self.render(entry.data, headers={'ETag': entry.etag})
+
+class AsyncUserListView(AsyncAPIView):
+    """
+    Versão assíncrona de UserListAPIView, com a mesma paginação por cursor e
+    sem a exportação NDJSON.
+    """
+    metrics_endpoint = 'users-async'
+
+    async def get(self, request):
+        paginator = UserKeysetPagination()
+        queryset = User.objects.values(*UserValuesSerializer.field_names)
+        with stage_timer(self.metrics_endpoint, 'query'):
+            rows = await paginator.apaginate_queryset(queryset, request)
+            data = paginator.get_paginated_data(UserValuesSerializer(rows, many=True).data)
+        return self.render(data)
@@ -0,0 +1,86 @@
+"""
+Requisições por segundo nas rotas de API com a pilha completa de
+middlewares (setup.settings) e com o perfil só de API (setup.settings_api).
+
+Uso (a partir de auth-service/):
+
+    python -m benchmarks.bench_api_middleware --requests 2000
+
+O login roda com poucas iterações de PBKDF2 para que o custo do hash não
+esconda o da pilha de requisição. As requisições passam pelo handler do
+Django em processo, sem rede, então os números medem só o trabalho do
+servidor por requisição.
+"""
+
+import argparse
+import time
+
+from benchmarks.common import benchmark_database, seed_users, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--iterations', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test import Client, override_settings
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+    from api.tokens import RefreshToken
+    from core.models import User
+    from setup import settings_api
+
+    setup_test_environment()
+    profiles = {
+        'completo (setup.settings)': {},
+        'só API (setup.settings_api)': {
+            'MIDDLEWARE': settings_api.MIDDLEWARE,
+            'ROOT_URLCONF': settings_api.ROOT_URLCONF,
+            'REST_FRAMEWORK': settings_api.REST_FRAMEWORK,
+        },
+    }
+
+    def requests_per_second(send):
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            response = send()
+            assert response.status_code == 200, response.status_code
+        return args.requests / (time.perf_counter() - start)
+
+    hasher_params = {**settings.PASSWORD_HASHER_PARAMS, 'PBKDF2_ITERATIONS': args.iterations}
+    rate_limit = {**settings.LOGIN_RATE_LIMIT, 'ENABLED': False}
+    results = {}
+    with override_settings(PASSWORD_HASHER_PARAMS=hasher_params, LOGIN_RATE_LIMIT=rate_limit):
+        with benchmark_database():
+            seed_users(1)
+            user = User.objects.get()
+            authorization = f'Bearer {RefreshToken.for_user(user).access_token}'
+            credentials = {'email': user.email, 'password': 'benchpass123'}
+            for name, overrides in profiles.items():
+                with override_settings(**overrides):
+                    client = Client()
+                    login_url = reverse('login')
+                    user_url = reverse('user', kwargs={'pk': user.pk})
+                    results[name] = {
+                        'login': requests_per_second(
+                            lambda: client.post(login_url, credentials, content_type='application/json')
+                        ),
+                        'user': requests_per_second(
+                            lambda: client.get(user_url, HTTP_AUTHORIZATION=authorization)
+                        ),
+                    }
+
+    baseline = next(iter(results.values()))
+    print(f'{args.requests} requisições por rota, PBKDF2 com {args.iterations} iterações')
+    for name, result in results.items():
+        print(
+            f"{name:30} login {result['login']:8.0f} req/s ({result['login'] / baseline['login']:4.2f}x)  "
+            f"user {result['user']:8.0f} req/s ({result['user'] / baseline['user']:4.2f}x)"
+        )
+
+
+if __name__ == '__main__':
+    main()
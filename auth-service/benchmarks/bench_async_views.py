@@ -0,0 +1,239 @@
+"""
+Vazão e latência das views de usuário com muitas conexões simultâneas:
+views síncronas servidas por WSGI, as mesmas views sob ASGI e as views
+assíncronas sob ASGI.
+
+Uso (a partir de auth-service/):
+
+    python -m benchmarks.bench_async_views --connections 1000 --requests 5
+
+Cada perfil sobe o Gunicorn com gunicorn.conf.py (SERVER_MODE wsgi ou asgi)
+contra um banco de teste semeado pelo benchmark; com SQLite o banco de teste
+é um arquivo temporário, compartilhado pelos workers. Um cliente HTTP/1.1 em
+asyncio mantém ``--connections`` conexões keep-alive abertas ao mesmo tempo,
+cada uma enviando ``--requests`` requisições em sequência. Cliente e
+servidor disputam a mesma máquina, então os números servem para comparar os
+perfis entre si.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import BASE_DIR, benchmark_database, seed_users, setup_django, summarize
+
+PASSWORD = 'benchpass123'
+
+# Perfil: (SERVER_MODE, views)
+PROFILES = {
+    'wsgi + views síncronas': ('wsgi', 'sync'),
+    'asgi + views síncronas': ('asgi', 'sync'),
+    'asgi + views assíncronas': ('asgi', 'async'),
+}
+
+# Endpoint: nome da rota por tipo de view
+ROUTES = {
+    'user': {'sync': 'user', 'async': 'user-async'},
+    'users': {'sync': 'users', 'async': 'users-async'},
+    'login': {'sync': 'login', 'async': 'login-async'},
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, port, env):
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+        cwd=BASE_DIR,
+        env={**os.environ, **env, 'SERVER_MODE': mode, 'SERVER_BIND': f'127.0.0.1:{port}'},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'o Gunicorn ({mode}) terminou com código {process.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'o Gunicorn ({mode}) não respondeu em 30s')
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def build_request(method, path, authorization=None, body=None):
+    lines = [f'{method} {path} HTTP/1.1', 'Host: 127.0.0.1']
+    if authorization:
+        lines.append(f'Authorization: {authorization}')
+    payload = b''
+    if body is not None:
+        payload = json.dumps(body).encode()
+        lines += ['Content-Type: application/json', f'Content-Length: {len(payload)}']
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode() + payload
+
+
+async def read_response(reader):
+    """
+    Lê uma resposta HTTP/1.1 e retorna ``(status, manter a conexão)``.
+    """
+    head = await reader.readuntil(b'\r\n\r\n')
+    status_line, *header_lines = head.decode('latin-1').split('\r\n')
+    headers = {}
+    for line in header_lines:
+        if line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    return int(status_line.split()[1]), headers.get('connection', '').lower() != 'close'
+
+
+async def run_load(port, requests, connections, timeout):
+    latencies, statuses = [], {}
+
+    async def connection_worker(payloads):
+        reader = writer = None
+        for payload in payloads:
+            start = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                writer.write(payload)
+                status, keep_alive = await asyncio.wait_for(read_response(reader), timeout)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                status, keep_alive = type(e).__name__, False
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            if not keep_alive and writer is not None:
+                writer.close()
+                reader = writer = None
+        if writer is not None:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(connection_worker(payloads) for payloads in requests[:connections]))
+    wall = time.perf_counter() - start
+    return latencies, statuses, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=5, help='requisições por conexão')
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--endpoints', nargs='+', choices=tuple(ROUTES), default=['user', 'users'])
+    parser.add_argument('--profiles', nargs='+', choices=tuple(PROFILES), default=list(PROFILES))
+    parser.add_argument('--settings', default='setup.settings_api', help='DJANGO_SETTINGS_MODULE dos servidores')
+    parser.add_argument('--workers', type=int, help='WEB_CONCURRENCY (padrão: o do gunicorn.conf.py)')
+    parser.add_argument('--iterations', type=int, default=1000, help='PBKDF2_ITERATIONS, para o login')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--output', help='grava o resultado em JSON')
+    args = parser.parse_args()
+
+    # Mesmo custo de hash no seed e nos servidores
+    os.environ['PBKDF2_ITERATIONS'] = str(args.iterations)
+    setup_django()
+    from django.db import connection
+    from django.urls import reverse
+    from api.tokens import RefreshToken
+    from core.models import User
+
+    tmpdir = Path(tempfile.mkdtemp(prefix='bench-async-'))
+    if connection.vendor == 'sqlite':
+        connection.settings_dict['TEST']['NAME'] = str(tmpdir / 'bench.sqlite3')
+
+    results = {}
+    with benchmark_database():
+        seed_users(args.users, password=PASSWORD)
+        user = User.objects.order_by('pk').first()
+        authorization = f'Bearer {RefreshToken.for_user(user).access_token}'
+        pks = list(User.objects.order_by('pk').values_list('pk', flat=True)[:1000])
+        connection.close()
+
+        server_env = {
+            'DJANGO_SETTINGS_MODULE': args.settings,
+            'POSTGRES_DB': connection.settings_dict['NAME'],
+            'ALLOWED_HOSTS': '127.0.0.1',
+            'LOGIN_RATE_LIMIT_ENABLED': 'False',
+            'PROMETHEUS_MULTIPROC_DIR': str(tmpdir / 'prometheus'),
+        }
+        if args.workers:
+            server_env['WEB_CONCURRENCY'] = str(args.workers)
+
+        for profile in args.profiles:
+            mode, kind = PROFILES[profile]
+            port = free_port()
+            process = start_server(mode, port, server_env)
+            try:
+                for endpoint in args.endpoints:
+                    route = ROUTES[endpoint][kind]
+                    requests = []
+                    for c in range(args.connections):
+                        payloads = []
+                        for r in range(args.requests):
+                            i = c * args.requests + r
+                            if endpoint == 'user':
+                                path = reverse(route, kwargs={'pk': pks[i % len(pks)]})
+                                payloads.append(build_request('GET', path, authorization))
+                            elif endpoint == 'users':
+                                payloads.append(build_request('GET', reverse(route), authorization))
+                            else:
+                                credentials = {'email': f'user{i % args.users}@bench.local', 'password': PASSWORD}
+                                payloads.append(build_request('POST', reverse(route), body=credentials))
+                        requests.append(payloads)
+
+                    # Aquece os workers (conexões com o banco, caches) fora da medição
+                    asyncio.run(run_load(port, requests[:8], 8, args.timeout))
+                    latencies, statuses, wall = asyncio.run(run_load(port, requests, args.connections, args.timeout))
+                    results.setdefault(profile, {})[endpoint] = {
+                        'throughput': len(latencies) / wall,
+                        'latency_ms': {name: value * 1e3 for name, value in summarize(latencies).items()},
+                        'statuses': {str(status): count for status, count in statuses.items()},
+                    }
+            finally:
+                stop_server(process)
+
+    print(f'{args.connections} conexões simultâneas, {args.requests} requisições por conexão, {args.users} usuários')
+    for endpoint in args.endpoints:
+        baseline = None
+        for profile in args.profiles:
+            stats = results[profile][endpoint]
+            baseline = baseline or stats['throughput']
+            latency = stats['latency_ms']
+            print(
+                f"{endpoint:6} {profile:26} {stats['throughput']:8.1f} req/s ({stats['throughput'] / baseline:4.2f}x)  "
+                f"p50 {latency['p50']:8.1f} ms  p95 {latency['p95']:8.1f} ms  p99 {latency['p99']:8.1f} ms  "
+                f"status={stats['statuses']}"
+            )
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
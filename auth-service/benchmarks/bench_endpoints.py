@@ -0,0 +1,257 @@
+"""
+Carga concorrente nos endpoints de autenticação: vazão, latência
+(p50/p95/p99), consultas por requisição e tempo de hash de senha.
+
+Uso (a partir de auth-service/):
+
+    python -m benchmarks.bench_endpoints --users 10000 --requests 200 --concurrency 8
+    python -m benchmarks.bench_endpoints --compare benchmarks/results/<commit>.json
+
+Roda contra o banco configurado em DATABASES (SQLite ou um PostgreSQL
+local), sempre em um banco de teste descartável. Cada thread usa o seu
+próprio cliente e a sua conexão com o banco; as requisições passam pelo
+handler do Django em processo, sem rede.
+
+O resultado é gravado em JSON (por padrão em benchmarks/results/, com o
+commit atual no nome) para comparar execuções com ``--compare``. O
+limitador de login fica desligado durante a medição.
+"""
+
+import argparse
+import functools
+import json
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from benchmarks.common import BASE_DIR, benchmark_database, seed_users, setup_django, summarize
+
+PASSWORD = 'benchpass123'
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def endpoint_requests(reverse, users, authorization, refresh_tokens):
+    """
+    Requisição de cada endpoint: ``(status esperado, função(client, i))``.
+    Cada renovação usa um refresh token diferente, já que com rotação um
+    token reapresentado revoga a sessão.
+    """
+    def login(client, i):
+        email = f'user{i % users}@bench.local'
+        return client.post(reverse('login'), {'email': email, 'password': PASSWORD}, content_type='application/json')
+
+    def register(client, i):
+        data = {'email': f'new{i}@bench.local', 'role': 'client', 'password': PASSWORD, 'password2': PASSWORD}
+        return client.post(reverse('user-register'), data, content_type='application/json')
+
+    def user_list(client, i):
+        return client.get(reverse('users'), HTTP_AUTHORIZATION=authorization)
+
+    def refresh(client, i):
+        return client.post(reverse('token-refresh'), {'refresh': refresh_tokens[i]}, content_type='application/json')
+
+    return {
+        'login': (200, login),
+        'refresh': (200, refresh),
+        'register': (201, register),
+        'users': (200, user_list),
+    }
+
+
+class HashTimer:
+    """
+    Soma, por thread, o tempo gasto em ``encode``/``verify`` dos hashers
+    configurados em PASSWORD_HASHERS.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def install(self):
+        from django.contrib.auth.hashers import get_hashers
+        for hasher in get_hashers():
+            hasher.encode = self._timed(hasher.encode)
+            hasher.verify = self._timed(hasher.verify)
+
+    def _timed(self, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            # O verify do PBKDF2 e do scrypt chama o encode: só a chamada
+            # mais externa é somada
+            if getattr(self._local, 'active', False):
+                return method(*args, **kwargs)
+            self._local.active = True
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._local.active = False
+                self._local.seconds = self.seconds() + time.perf_counter() - start
+        return wrapper
+
+    def reset(self):
+        self._local.seconds = 0.0
+
+    def seconds(self):
+        return getattr(self._local, 'seconds', 0.0)
+
+
+def run_endpoint(send, expected, requests, concurrency, hash_timer):
+    from django.db import connection
+    from django.test import Client
+
+    def worker(indexes):
+        client = Client()
+        samples = []
+        queries = 0
+
+        def count_queries(execute, *args):
+            nonlocal queries
+            queries += 1
+            return execute(*args)
+
+        try:
+            with connection.execute_wrapper(count_queries):
+                for i in indexes:
+                    hash_timer.reset()
+                    before = queries
+                    start = time.perf_counter()
+                    response = send(client, i)
+                    elapsed = time.perf_counter() - start
+                    samples.append((response.status_code, elapsed, queries - before, hash_timer.seconds()))
+        finally:
+            connection.close()
+        return samples
+
+    # Aquece caches do processo (chaves, URLs, hash fictício) fora da medição
+    send(Client(), -1)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        chunks = executor.map(worker, [range(n, requests, concurrency) for n in range(concurrency)])
+        samples = [sample for chunk in chunks for sample in chunk]
+    wall = time.perf_counter() - start
+
+    statuses = {}
+    for code, *_ in samples:
+        statuses[str(code)] = statuses.get(str(code), 0) + 1
+    latencies = [elapsed for _, elapsed, _, _ in samples]
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': requests - statuses.get(str(expected), 0),
+        'statuses': statuses,
+        'throughput': requests / wall,
+        'latency_ms': {name: value * 1e3 for name, value in summarize(latencies).items()},
+        'queries_per_request': sum(sample[2] for sample in samples) / requests,
+        'hash_ms_per_request': sum(sample[3] for sample in samples) / requests * 1e3,
+    }
+
+
+def print_results(results, baseline=None):
+    meta = results['meta']
+    print(
+        f"commit {meta['commit']}  {meta['database']}  {meta['users']} usuários  "
+        f"{meta['concurrency']} threads  hasher {meta['hasher']}"
+    )
+    for name, stats in results['endpoints'].items():
+        latency = stats['latency_ms']
+        line = (
+            f"{name:9} {stats['throughput']:8.1f} req/s  p50 {latency['p50']:7.1f} ms  "
+            f"p95 {latency['p95']:7.1f} ms  p99 {latency['p99']:7.1f} ms  "
+            f"{stats['queries_per_request']:5.1f} queries  hash {stats['hash_ms_per_request']:7.1f} ms  "
+            f"erros {stats['errors']}"
+        )
+        previous = (baseline or {}).get('endpoints', {}).get(name)
+        if previous:
+            line += (
+                f"  | vazão {stats['throughput'] / previous['throughput']:5.2f}x  "
+                f"p95 {latency['p95'] - previous['latency_ms']['p95']:+7.1f} ms  "
+                f"queries {stats['queries_per_request'] - previous['queries_per_request']:+5.1f}"
+            )
+        print(line)
+    if baseline:
+        print(f"comparado com o commit {baseline['meta']['commit']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--requests', type=int, default=200, help='requisições por endpoint')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--endpoints', nargs='+', choices=('login', 'refresh', 'register', 'users'),
+                        default=['login', 'refresh', 'register', 'users'])
+    parser.add_argument('--iterations', type=int, help='PBKDF2_ITERATIONS (padrão: o de PASSWORD_HASHER_PARAMS)')
+    parser.add_argument('--output', help='arquivo JSON (padrão: benchmarks/results/endpoints-<commit>.json)')
+    parser.add_argument('--compare', help='JSON de uma execução anterior')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.hashers import get_hasher
+    from django.db import connection
+    from django.test import override_settings
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+    from api.tokens import RefreshToken
+    from core.factories import AdminUserFactory
+
+    setup_test_environment()
+    hasher_params = dict(settings.PASSWORD_HASHER_PARAMS)
+    if args.iterations is not None:
+        hasher_params['PBKDF2_ITERATIONS'] = args.iterations
+    rate_limit = {**settings.LOGIN_RATE_LIMIT, 'ENABLED': False}
+
+    hash_timer = HashTimer()
+    hash_timer.install()
+    commit = current_commit()
+    results = {
+        'meta': {
+            'commit': commit,
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'users': args.users,
+            'concurrency': args.concurrency,
+            'hasher': get_hasher().algorithm,
+            'hasher_params': hasher_params,
+        },
+        'endpoints': {},
+    }
+    with override_settings(PASSWORD_HASHER_PARAMS=hasher_params, LOGIN_RATE_LIMIT=rate_limit):
+        with benchmark_database():
+            seed_users(args.users, password=PASSWORD)
+            admin = AdminUserFactory(password=PASSWORD)
+            authorization = f'Bearer {RefreshToken.for_user(admin).access_token}'
+            refresh_tokens = [str(RefreshToken.for_user(admin)) for _ in range(args.requests + 1)]
+            requests = endpoint_requests(reverse, args.users, authorization, refresh_tokens)
+            for name in args.endpoints:
+                expected, send = requests[name]
+                results['endpoints'][name] = run_endpoint(
+                    send, expected, args.requests, args.concurrency, hash_timer
+                )
+
+    output = BASE_DIR / (args.output or f"benchmarks/results/endpoints-{commit or 'local'}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    print(f'resultado gravado em {output}')
+
+
+if __name__ == '__main__':
+    main()
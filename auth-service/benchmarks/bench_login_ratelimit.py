@@ -0,0 +1,85 @@
+"""
+Hashing evitado pelo limitador de login sob um ataque de credential stuffing
+simulado: tentativas com senha errada contra poucas contas, partindo de
+poucos IPs, com e sem LOGIN_RATE_LIMIT.
+
+Uso (a partir de auth-service/):
+
+    python -m benchmarks.bench_login_ratelimit --attempts 300 --targets 10 --ips 5
+"""
+
+import argparse
+import time
+
+from benchmarks.common import benchmark_database, seed_users, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--attempts', type=int, default=300)
+    parser.add_argument('--targets', type=int, default=10)
+    parser.add_argument('--ips', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test import override_settings
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from api.ratelimit import get_login_rate_limiter
+    from core.models import User
+
+    setup_test_environment()
+    hashes = 0
+    check_password = User.check_password
+
+    def counting_check_password(self, raw_password):
+        nonlocal hashes
+        hashes += 1
+        return check_password(self, raw_password)
+
+    User.check_password = counting_check_password
+
+    def attack(enabled):
+        nonlocal hashes
+        hashes = 0
+        client = APIClient()
+        url = reverse('login')
+        config = {**settings.LOGIN_RATE_LIMIT, 'ENABLED': enabled, 'STORE': 'memory'}
+        statuses = {}
+        with override_settings(LOGIN_RATE_LIMIT=config):
+            limiter = get_login_rate_limiter()
+            start_cpu, start_wall = time.process_time(), time.perf_counter()
+            for i in range(args.attempts):
+                response = client.post(
+                    url,
+                    {'email': f'user{i % args.targets}@bench.local', 'password': 'wrong-password'},
+                    format='json',
+                    REMOTE_ADDR=f'10.0.0.{i % args.ips + 1}',
+                )
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            cpu, wall = time.process_time() - start_cpu, time.perf_counter() - start_wall
+            metrics = limiter.metrics()
+        return {'hashes': hashes, 'cpu': cpu, 'wall': wall, 'statuses': statuses, 'metrics': metrics}
+
+    with benchmark_database():
+        seed_users(args.targets)
+        results = {
+            'sem limitador': attack(enabled=False),
+            'com limitador': attack(enabled=True),
+        }
+
+    baseline = results['sem limitador']
+    print(f'{args.attempts} tentativas, {args.targets} contas, {args.ips} IPs')
+    for name, result in results.items():
+        print(
+            f"{name:14} {result['hashes']:6} hashes  {result['cpu']:8.2f}s CPU  "
+            f"{result['wall']:8.2f}s  status={result['statuses']}  {result['metrics']}"
+        )
+    saved = baseline['cpu'] - results['com limitador']['cpu']
+    print(f'CPU economizada: {saved:.2f}s ({saved / baseline["cpu"]:.0%})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Latência de verificação de senha por perfil de hasher nesta máquina: o
+PBKDF2 padrão do Django e os perfis de PASSWORD_HASHER_PARAMS.
+
+Uso (a partir de auth-service/):
+
+    python -m benchmarks.bench_password_hashers --repeat 20
+
+Os parâmetros vêm do ambiente (PBKDF2_ITERATIONS, SCRYPT_WORK_FACTOR,
+ARGON2_MEMORY_COST, ...), então perfis diferentes podem ser comparados
+sem alterar o código. O perfil argon2 só é medido com argon2-cffi instalado.
+"""
+
+import argparse
+import time
+
+from benchmarks.common import setup_django, summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.hashers import PBKDF2PasswordHasher
+    from core.hashers import TunedArgon2PasswordHasher, TunedPBKDF2PasswordHasher, TunedScryptPasswordHasher
+
+    params = settings.PASSWORD_HASHER_PARAMS
+    profiles = {
+        f'pbkdf2 padrão do Django ({PBKDF2PasswordHasher.iterations})': PBKDF2PasswordHasher(),
+        f"pbkdf2 ({params['PBKDF2_ITERATIONS']})": TunedPBKDF2PasswordHasher(),
+        f"scrypt (n={params['SCRYPT_WORK_FACTOR']}, r={params['SCRYPT_BLOCK_SIZE']}, "
+        f"p={params['SCRYPT_PARALLELISM']})": TunedScryptPasswordHasher(),
+        f"argon2id (m={params['ARGON2_MEMORY_COST']} KiB, t={params['ARGON2_TIME_COST']}, "
+        f"p={params['ARGON2_PARALLELISM']})": TunedArgon2PasswordHasher(),
+    }
+
+    password = 'correct horse battery staple'
+    results = {}
+    for name, hasher in profiles.items():
+        try:
+            encoded = hasher.encode(password, hasher.salt())
+        except ValueError as e:
+            print(f'{name}: ignorado ({e})')
+            continue
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            assert hasher.verify(password, encoded)
+            timings.append(time.perf_counter() - start)
+        results[name] = summarize(timings)
+
+    baseline = next(iter(results.values()))['p50']
+    print(f'verificação de senha, {args.repeat} execuções por perfil')
+    for name, stats in results.items():
+        print(
+            f"{name:48} p50 {stats['p50'] * 1e3:8.1f} ms  p95 {stats['p95'] * 1e3:8.1f} ms  "
+            f"{baseline / stats['p50']:5.2f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Custo por linha da serialização de usuários: instâncias do model com
+UserSerializer versus projeção ``.values()`` com UserValuesSerializer.
+
+Uso (a partir de auth-service/):
+
+    python -m benchmarks.bench_user_serializer --users 100000
+"""
+
+import argparse
+
+from benchmarks.common import benchmark_database, best_of, seed_users, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    from api.serializers import UserSerializer, UserValuesSerializer
+    from core.models import User
+
+    ordering = ('role', 'user_id')
+
+    def model_path():
+        queryset = User.objects.order_by(*ordering)
+        return UserSerializer(queryset, many=True).data
+
+    def values_path():
+        queryset = User.objects.values(*UserValuesSerializer.field_names).order_by(*ordering)
+        return UserValuesSerializer(queryset, many=True).data
+
+    with benchmark_database():
+        seed_users(args.users)
+        assert model_path() == values_path()
+        results = {
+            'UserSerializer (model)': best_of(model_path, args.repeat),
+            'UserValuesSerializer (values)': best_of(values_path, args.repeat),
+        }
+
+    baseline = results['UserSerializer (model)']
+    print(f'{args.users} usuários, melhor de {args.repeat} execuções')
+    for name, seconds in results.items():
+        per_row = seconds / args.users * 1e6
+        print(f'{name:32} {seconds:8.3f}s  {per_row:7.2f} µs/linha  {baseline / seconds:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
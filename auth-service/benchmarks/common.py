@@ -0,0 +1,88 @@
+"""
+Utilitários compartilhados pelos benchmarks.
+
+Os benchmarks rodam contra um banco de teste criado e destruído a cada
+execução (o mesmo mecanismo usado pelo pytest-django), então nunca tocam nos
+dados do banco configurado em DATABASES.
+"""
+
+import contextlib
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'setup.settings')
+    import django
+    django.setup()
+
+
+@contextlib.contextmanager
+def benchmark_database():
+    from django.db import connection
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def seed_users(count, password='benchpass123', batch_size=5000):
+    """
+    Insere ``count`` usuários construídos pelo UserFactory, em lote e
+    reaproveitando um único hash de senha.
+    """
+    import factory
+    from django.contrib.auth.hashers import make_password
+    from core.factories import UserFactory
+    from core.models import User
+
+    roles = ('client', 'collaborator')
+    encoded = make_password(password)
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        users = UserFactory.build_batch(
+            size,
+            email=factory.Iterator([f'user{i}@bench.local' for i in range(start, start + size)]),
+            role=factory.Iterator(roles),
+        )
+        for user in users:
+            user.password = encoded
+        User.objects.bulk_create(users)
+
+
+def best_of(func, repeat=5):
+    """
+    Executa ``func`` ``repeat`` vezes e retorna o menor tempo em segundos.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(values):
+    return {
+        'mean': statistics.fmean(values) if values else 0.0,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+    }
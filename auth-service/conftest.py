@@ -0,0 +1,13 @@
+import pytest
+from django.core.cache import caches
+from api.ratelimit import get_login_rate_limiter
+from api.unknown_users import get_known_email_filter
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Garante que cada teste começa com os caches e contadores em memória vazios"""
+    get_login_rate_limiter.cache_clear()
+    get_known_email_filter.cache_clear()
+    for cache in caches.all(initialized_only=False):
+        cache.clear()
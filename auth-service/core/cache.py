@@ -0,0 +1,222 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Armazenamento global por LOCATION, compartilhado entre as instâncias do
+# backend que o CacheHandler cria para cada thread.
+_stores = {}
+_locks = {}
+
+
+class LRUCache(BaseCache):
+    """
+    Cache em memória do processo com expiração por TTL e descarte LRU.
+
+    Ao contrário do LocMemCache, os valores não passam por pickle: o objeto
+    armazenado é devolvido como está, então não deve ser modificado por quem
+    o lê. Ao atingir MAX_ENTRIES, descarta apenas a entrada usada há mais
+    tempo.
+    """
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        self._store = _stores.setdefault(name, OrderedDict())
+        self._lock = _locks.setdefault(name, threading.Lock())
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            if self._get_entry(key) is not None:
+                return False
+            self._set(key, value, timeout)
+            return True
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            entry = self._get_entry(key)
+        return default if entry is None else entry[0]
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            self._set(key, value, timeout)
+
+    def get_many(self, keys, version=None):
+        keys = {self.make_and_validate_key(key, version=version): key for key in keys}
+        found = {}
+        with self._lock:
+            for key, original in keys.items():
+                entry = self._get_entry(key)
+                if entry is not None:
+                    found[original] = entry[0]
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        data = {self.make_and_validate_key(key, version=version): value for key, value in data.items()}
+        with self._lock:
+            for key, value in data.items():
+                self._set(key, value, timeout)
+        return []
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            entry = self._get_entry(key)
+            if entry is None:
+                return False
+            self._store[key] = (entry[0], self.get_backend_timeout(timeout))
+            return True
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            entry = self._get_entry(key)
+            if entry is None:
+                raise ValueError("Key '%s' not found" % key)
+            value = entry[0] + delta
+            self._store[key] = (value, entry[1])
+        return value
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            return self._get_entry(key) is not None
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            return self._store.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+
+    # O LRUCache nunca bloqueia (o lock só protege operações em memória),
+    # então as versões assíncronas rodam direto no event loop, sem o
+    # sync_to_async padrão do BaseCache
+    async def aadd(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.add(key, value, timeout, version)
+
+    async def aget(self, key, default=None, version=None):
+        return self.get(key, default, version)
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set(key, value, timeout, version)
+
+    async def adelete(self, key, version=None):
+        return self.delete(key, version)
+
+    def _get_entry(self, key):
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        expires_at = entry[1]
+        if expires_at is not None and expires_at <= time.time():
+            del self._store[key]
+            return None
+        self._store.move_to_end(key)
+        return entry
+
+    def _set(self, key, value, timeout):
+        self._store[key] = (value, self.get_backend_timeout(timeout))
+        self._store.move_to_end(key)
+        while len(self._store) > self._max_entries:
+            self._store.popitem(last=False)
+
+
+def user_cache():
+    """
+    Cache usado para as representações de usuário (USER_CACHE_ALIAS).
+    """
+    return caches[settings.USER_CACHE_ALIAS]
+
+
+def user_cache_key(user_id):
+    return f'user:{uuid.UUID(str(user_id)).hex}'
+
+
+def token_version_cache():
+    """
+    Cache de curta duração com o token_version de cada usuário
+    (TOKEN_VERSION_CACHE_ALIAS).
+    """
+    return caches[settings.TOKEN_VERSION_CACHE_ALIAS]
+
+
+def token_version_cache_key(user_id):
+    return f'token-version:{uuid.UUID(str(user_id)).hex}'
+
+
+def get_token_version(user_id):
+    """
+    Retorna o token_version atual do usuário, ou ``None`` se ele não existir
+    ou estiver inativo.
+    """
+    from .models import User
+
+    cache = token_version_cache()
+    key = token_version_cache_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = (
+            User.objects.filter(pk=user_id, is_active=True)
+            .values_list('token_version', flat=True)
+            .first()
+        )
+        if version is None:
+            return None
+        cache.set(key, version)
+    return version
+
+
+def get_token_versions(user_ids):
+    """
+    Versão em lote de ``get_token_version``: ``{user_id: token_version}``
+    só com os usuários existentes e ativos, com uma leitura do cache e uma
+    consulta ``IN`` para os ausentes.
+    """
+    from .models import User
+
+    cache = token_version_cache()
+    keys = {token_version_cache_key(user_id): user_id for user_id in user_ids}
+    versions = {keys[key]: version for key, version in cache.get_many(keys).items()}
+    missing = [user_id for user_id in keys.values() if user_id not in versions]
+    if missing:
+        rows = dict(
+            User.objects.filter(pk__in=missing, is_active=True)
+            .values_list('pk', 'token_version')
+            .order_by()
+        )
+        cache.set_many({token_version_cache_key(pk): version for pk, version in rows.items()})
+        versions.update(
+            (user_id, rows[pk])
+            for user_id in missing
+            if (pk := uuid.UUID(str(user_id))) in rows
+        )
+    return versions
+
+
+async def aget_token_version(user_id):
+    """
+    Versão assíncrona de ``get_token_version``.
+    """
+    from .models import User
+
+    cache = token_version_cache()
+    key = token_version_cache_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = await (
+            User.objects.filter(pk=user_id, is_active=True)
+            .values_list('token_version', flat=True)
+            .afirst()
+        )
+        if version is None:
+            return None
+        await cache.aset(key, version)
+    return version
@@ -1,28 +1,50 @@
 import factory
+from functools import lru_cache
+from django.contrib.auth.hashers import make_password
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from factory.django import DjangoModelFactory
 from faker import Faker
 from core.models import User
 
 fake = Faker('pt_BR')
 
+
+@lru_cache(maxsize=None)
+def hashed_password(raw_password):
+    """
+    Hash de ``raw_password`` calculado uma vez e reaproveitado por todos os
+    usuários criados com a mesma senha.
+    """
+    return make_password(raw_password)
+
+
+@receiver(setting_changed)
+def reset_hashed_passwords(*, setting, **kwargs):
+    if setting in ('PASSWORD_HASHERS', 'PASSWORD_HASHER_PARAMS'):
+        hashed_password.cache_clear()
+
+
 class UserFactory(DjangoModelFactory):
     class Meta:
         model = User
         django_get_or_create = ('email',)
-        skip_postgeneration_save = True
 
-    email = factory.LazyAttribute(lambda _: fake.email())
+    email = factory.LazyAttribute(lambda _: fake.unique.email())
     role = 'client'
     is_active = True
     is_staff = False
     is_superuser = False
+    # Senha já com hash antes do INSERT, sem o UPDATE de um set_password()
+    password = factory.Transformer('testpass123', transform=hashed_password)
 
-    @factory.post_generation
-    def password(obj, create, extracted, **kwargs):
-        if create:
-            password = extracted if extracted else 'testpass123'
-            obj.set_password(password)
-            obj.save()
+    @classmethod
+    def create_batch(cls, size, **kwargs):
+        """
+        Cria ``size`` usuários com um único bulk_create, sem o get_or_create
+        por e-mail e sem disparar post_save (nem atualizar UserCount).
+        """
+        return User.objects.bulk_create(cls.build_batch(size, **kwargs))
 
 class AdminUserFactory(UserFactory):
     role = 'admin'
@@ -33,4 +55,4 @@ class CollaboratorUserFactory(UserFactory):
     role = 'collaborator'
 
 class ClientUserFactory(UserFactory):
-    role = 'client'
\ No newline at end of file
+    role = 'client'
@@ -0,0 +1,126 @@
+"""
+Hashers de senha com custo ajustável em PASSWORD_HASHER_PARAMS.
+
+Os hashers mantêm o nome do algoritmo do Django, então hashes já gravados
+continuam válidos e só os parâmetros de custo mudam. O tempo de cada
+verificação é registrado em ``auth_password_verify_seconds``.
+"""
+
+import base64
+import hashlib
+import time
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+    get_hasher,
+    identify_hasher,
+)
+from .metrics import PASSWORD_VERIFY_SECONDS
+
+
+def hasher_param(name):
+    return settings.PASSWORD_HASHER_PARAMS[name]
+
+
+class TimedHasherMixin:
+    """
+    Mede ``verify`` em ``auth_password_verify_seconds``. O ``encode`` não é
+    medido à parte porque o PBKDF2 e o scrypt o chamam dentro do verify.
+    """
+
+    def verify(self, password, encoded):
+        start = time.perf_counter()
+        try:
+            return super().verify(password, encoded)
+        finally:
+            PASSWORD_VERIFY_SECONDS.labels(self.algorithm).observe(time.perf_counter() - start)
+
+
+class TunedPBKDF2PasswordHasher(TimedHasherMixin, PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 com o número de iterações de PASSWORD_HASHER_PARAMS.
+    """
+
+    @property
+    def iterations(self):
+        return hasher_param('PBKDF2_ITERATIONS')
+
+
+def maxmem(n, r):
+    """
+    Limite de memória do scrypt: o que ele usa (128 * n * r) com folga, em
+    vez do limite padrão de 32 MiB do OpenSSL.
+    """
+    return 256 * n * r
+
+
+class TunedScryptPasswordHasher(TimedHasherMixin, ScryptPasswordHasher):
+    """
+    scrypt com custo de CPU/memória de PASSWORD_HASHER_PARAMS.
+    """
+
+    @property
+    def work_factor(self):
+        return hasher_param('SCRYPT_WORK_FACTOR')
+
+    @property
+    def block_size(self):
+        return hasher_param('SCRYPT_BLOCK_SIZE')
+
+    @property
+    def parallelism(self):
+        return hasher_param('SCRYPT_PARALLELISM')
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        # Como o encode do Django, mas com o limite de memória calculado
+        # a partir do n e r do hash: no verify eles vêm do hash gravado, que
+        # pode ser mais caro que o SCRYPT_WORK_FACTOR atual
+        self._check_encode_args(password, salt)
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash_ = hashlib.scrypt(
+            password.encode(),
+            salt=salt.encode(),
+            n=n,
+            r=r,
+            p=p,
+            maxmem=maxmem(n, r),
+            dklen=64,
+        )
+        hash_ = base64.b64encode(hash_).decode('ascii').strip()
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, n, salt, r, p, hash_)
+
+
+class TunedArgon2PasswordHasher(TimedHasherMixin, Argon2PasswordHasher):
+    """
+    Argon2id com custo de tempo/memória de PASSWORD_HASHER_PARAMS. Requer o
+    pacote argon2-cffi.
+    """
+
+    @property
+    def time_cost(self):
+        return hasher_param('ARGON2_TIME_COST')
+
+    @property
+    def memory_cost(self):
+        return hasher_param('ARGON2_MEMORY_COST')
+
+    @property
+    def parallelism(self):
+        return hasher_param('ARGON2_PARALLELISM')
+
+
+def must_upgrade(encoded):
+    """
+    Indica se o hash deve ser refeito com o hasher preferido, pelo mesmo
+    critério que ``User.check_password`` usa após uma senha correta.
+    """
+    preferred = get_hasher('default')
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
@@ -0,0 +1,55 @@
+import json
+from collections import Counter
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, identify_hasher
+from django.core.management.base import BaseCommand
+from core.hashers import must_upgrade
+from core.models import User
+
+# Campos de decode() que não são parâmetros de custo
+NON_PARAMS = {'algorithm', 'hash', 'salt', 'params'}
+
+
+class Command(BaseCommand):
+    help = "Mostra quantos usuários estão em cada hasher de senha e quantos serão atualizados no próximo login."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help="Saída em JSON.")
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Usuários lidos por consulta.")
+
+    def handle(self, *args, **options):
+        groups = Counter()
+        passwords = User.objects.values_list('password', flat=True).iterator(chunk_size=options['chunk_size'])
+        for encoded in passwords:
+            groups[self.classify(encoded)] += 1
+
+        rows = [
+            {'algorithm': algorithm, 'params': params, 'users': count, 'must_upgrade': upgrade}
+            for (algorithm, params, upgrade), count in sorted(groups.items(), key=lambda item: -item[1])
+        ]
+        if options['json']:
+            self.stdout.write(json.dumps(rows, ensure_ascii=False))
+            return
+
+        self.stdout.write(f"{'algoritmo':16} {'parâmetros':40} {'usuários':>10}  situação")
+        for row in rows:
+            status = 'a atualizar' if row['must_upgrade'] else 'atual'
+            self.stdout.write(f"{row['algorithm']:16} {row['params']:40} {row['users']:>10}  {status}")
+        pending = sum(row['users'] for row in rows if row['must_upgrade'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{sum(groups.values())} usuários, {pending} com hash a atualizar no próximo login."
+        ))
+
+    def classify(self, encoded):
+        if not encoded or encoded.startswith(UNUSABLE_PASSWORD_PREFIX):
+            return ('inutilizável', '', False)
+        try:
+            hasher = identify_hasher(encoded)
+        except ValueError:
+            return ('desconhecido', '', False)
+        try:
+            decoded = hasher.decode(encoded)
+        except (ValueError, TypeError, NotImplementedError):
+            params = '?'
+        else:
+            params = ' '.join(f'{key}={value}' for key, value in sorted(decoded.items()) if key not in NON_PARAMS)
+        return (hasher.algorithm, params, must_upgrade(encoded))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from core.stats import rebuild_user_counts
+
+
+class Command(BaseCommand):
+    help = "Recalcula a tabela UserCount a partir de User e mostra as diferenças corrigidas."
+
+    def handle(self, *args, **options):
+        drift = rebuild_user_counts()
+        for (role, is_active), (stored, actual) in drift.items():
+            situation = 'ativos' if is_active else 'inativos'
+            self.stdout.write(f"{role:12} {situation:8} {stored:>10} -> {actual:>10}")
+        if drift:
+            self.stdout.write(self.style.WARNING(f"{len(drift)} contagens corrigidas."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Contagens de usuários em dia."))
@@ -1,7 +1,26 @@
 from django.contrib.auth.base_user import BaseUserManager
+from django.db import transaction
+from django.db.models import F
 from django.utils.translation import gettext_lazy as _
 
 class UserManager(BaseUserManager):
+    @classmethod
+    def normalize_email(cls, email):
+        """
+        Forma canônica do e-mail: inteiro em minúsculas, não só o domínio.
+        """
+        return super().normalize_email(email).lower()
+
+    def by_email(self, email):
+        """
+        Usuários com o e-mail informado, sem diferenciar maiúsculas e
+        minúsculas. A consulta usa o índice único em Lower("email").
+        """
+        return self.filter(email__lower=self.normalize_email(email))
+
+    def get_by_natural_key(self, username):
+        return self.by_email(username).get()
+
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError(_("O Email é necessário para criar um usuário."))
@@ -21,3 +40,15 @@ class UserManager(BaseUserManager):
         if extra_fields.get("is_superuser") is not True:
             raise ValueError(_("SuperUser precisa ter um campo is_superuser=True"))
         return self.create_user(email, password, **extra_fields)
+
+    def revoke_tokens(self, user_id):
+        """
+        Invalida todos os tokens do usuário incrementando o token_version.
+        """
+        from .cache import token_version_cache, token_version_cache_key
+
+        updated = self.filter(pk=user_id).update(token_version=F("token_version") + 1)
+        key = token_version_cache_key(user_id)
+        token_version_cache().delete(key)
+        transaction.on_commit(lambda: token_version_cache().delete(key))
+        return updated
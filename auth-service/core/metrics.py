@@ -0,0 +1,130 @@
+import os
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from django.db import connections
+from prometheus_client import REGISTRY, CollectorRegistry, Histogram, multiprocess
+
+# Limites dos buckets em segundos, de 0,5 ms (leitura em cache) a 2,5 s
+# (hash de senha com custo alto)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+STAGE_SECONDS = Histogram(
+    'auth_stage_seconds', 'Duração de cada etapa dos endpoints de autenticação',
+    ['endpoint', 'stage'], buckets=LATENCY_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    'auth_request_seconds', 'Duração das requisições por rota',
+    ['endpoint'], buckets=LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    'auth_request_queries', 'Consultas ao banco por requisição',
+    ['endpoint'], buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 32),
+)
+PASSWORD_VERIFY_SECONDS = Histogram(
+    'auth_password_verify_seconds', 'Duração da verificação de senhas por algoritmo',
+    ['algorithm'], buckets=LATENCY_BUCKETS,
+)
+
+# Fontes de métricas adicionais, registradas pelos apps com register_metrics
+metric_sources = {}
+
+
+def register_metrics(name):
+    """
+    Registra uma função sem argumentos cujo retorno é publicado em /metrics
+    sob a chave ``name``.
+    """
+    def decorator(func):
+        metric_sources[name] = func
+        return func
+    return decorator
+
+
+def database_pool_stats():
+    """
+    Estatísticas do pool de conexões de cada banco que usa o pool do
+    psycopg 3; bancos sem pool aparecem como ``None``.
+    """
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], 'pool', None)
+        if pool is None:
+            stats[alias] = None
+            continue
+        raw = pool.get_stats()
+        stats[alias] = {
+            'size': raw.get('pool_size', 0),
+            'available': raw.get('pool_available', 0),
+            'in_use': raw.get('pool_size', 0) - raw.get('pool_available', 0),
+            'waiting': raw.get('requests_waiting', 0),
+            'created': raw.get('connections_num', 0),
+            'min_size': raw.get('pool_min', 0),
+            'max_size': raw.get('pool_max', 0),
+        }
+    return stats
+
+
+def collect_metrics():
+    metrics = {'database_pools': database_pool_stats()}
+    for name, source in metric_sources.items():
+        metrics[name] = source()
+    return metrics
+
+
+@lru_cache(maxsize=None)
+def stage_histogram(endpoint, stage):
+    # labels() passa por um lock a cada chamada; as séries são fixas, então
+    # cada uma é resolvida uma única vez
+    return STAGE_SECONDS.labels(endpoint, stage)
+
+
+class stage_timer:
+    """
+    Registra a duração do bloco ``with`` em ``auth_stage_seconds``. É uma
+    classe, e não um @contextmanager, para evitar o custo do gerador em
+    cada etapa medida.
+    """
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, endpoint, stage):
+        self.histogram = stage_histogram(endpoint, stage)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class QueryCounter:
+    __slots__ = ('count',)
+
+    def __init__(self):
+        self.count = 0
+
+
+# Contador da requisição em andamento; o contexto acompanha o código
+# síncrono chamado via sync_to_async, então consultas do ORM assíncrono
+# também são contadas
+current_query_counter = ContextVar('current_query_counter', default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    counter = current_query_counter.get()
+    if counter is not None:
+        counter.count += 1
+    return execute(sql, params, many, context)
+
+
+def prometheus_registry():
+    """
+    Registry publicado em /metrics. Com PROMETHEUS_MULTIPROC_DIR definido,
+    cada processo grava as suas métricas em arquivos próprios, sem
+    coordenação entre eles, e a coleta soma os arquivos de todos os workers.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
@@ -0,0 +1,50 @@
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from .metrics import REQUEST_QUERIES, REQUEST_SECONDS, QueryCounter, current_query_counter
+
+
+class RequestMetricsMiddleware:
+    """
+    Registra a duração e o número de consultas ao banco de cada requisição,
+    rotuladas pelo nome da rota. Rotas sem nome e 404 são ignoradas, para
+    que caminhos arbitrários não criem séries novas.
+
+    Funciona nos modos síncrono e assíncrono, sem forçar a troca de thread
+    nas views assíncronas.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        token = current_query_counter.set(counter)
+        start = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            current_query_counter.reset(token)
+            self.record(request, counter, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        token = current_query_counter.set(counter)
+        start = time.perf_counter()
+        try:
+            return await self.get_response(request)
+        finally:
+            current_query_counter.reset(token)
+            self.record(request, counter, time.perf_counter() - start)
+
+    def record(self, request, counter, seconds):
+        match = getattr(request, 'resolver_match', None)
+        if match is None or not match.url_name:
+            return
+        REQUEST_SECONDS.labels(match.url_name).observe(seconds)
+        REQUEST_QUERIES.labels(match.url_name).observe(counter.count)
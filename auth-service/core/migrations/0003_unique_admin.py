@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:18
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def demote_extra_admins(apps, schema_editor):
+    """
+    Mantém um único admin antes de criar a constraint: o que fez login por
+    último (com empate, o menor user_id). Os demais passam a collaborator,
+    perdem is_staff e is_superuser e têm os tokens revogados, já que os
+    tokens emitidos levam a role como claim.
+    """
+    User = apps.get_model('core', 'User')
+    admins = User.objects.using(schema_editor.connection.alias).filter(role='admin').order_by(
+        F('last_login').desc(nulls_last=True), 'user_id',
+    )
+    extra = list(admins.values_list('pk', flat=True)[1:])
+    if extra:
+        User.objects.using(schema_editor.connection.alias).filter(pk__in=extra).update(
+            role='collaborator',
+            is_staff=False,
+            is_superuser=False,
+            token_version=F('token_version') + 1,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0002_user_token_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(demote_extra_admins, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(condition=models.Q(('role', 'admin')), fields=('role',), name='unique_admin'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:34
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Case, Count, F, Value, When
+from django.db.models.functions import Lower
+
+
+def canonicalize_emails(apps, schema_editor):
+    """
+    Deixa os e-mails em minúsculas. Quando dois usuários diferem só na
+    caixa do e-mail, mantém o admin ou, entre os demais, o que fez login por
+    último; os outros são desativados e recebem um e-mail de descarte, já
+    que o índice único em Lower("email") não os admitiria.
+    """
+    User = apps.get_model('core', 'User')
+    users = User.objects.using(schema_editor.connection.alias).annotate(email_lower=Lower('email'))
+    duplicates = list(
+        users.values('email_lower')
+        .annotate(total=Count('pk'))
+        .filter(total__gt=1)
+        .values_list('email_lower', flat=True)
+    )
+    for email in duplicates:
+        group = users.filter(email_lower=email).order_by(
+            Case(When(role='admin', then=Value(0)), default=Value(1)),
+            F('last_login').desc(nulls_last=True),
+            'user_id',
+        )
+        discarded = [user.pk for user in group[1:]]
+        for pk in discarded:
+            users.filter(pk=pk).update(is_active=False, email=f'duplicate-{pk.hex}@invalid')
+    users.exclude(email=F('email_lower')).update(email=Lower('email'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0003_unique_admin'),
+    ]
+
+    operations = [
+        migrations.RunPython(canonicalize_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='unique_email_lower'),
+        ),
+    ]
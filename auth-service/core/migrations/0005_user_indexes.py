@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0004_email_lower'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='user',
+            options={'ordering': ['role', 'user_id'], 'verbose_name': 'User', 'verbose_name_plural': 'Users'},
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'user_id'], name='user_role_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['role'], name='user_active_role_idx'),
+        ),
+    ]
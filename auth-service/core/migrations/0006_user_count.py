@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:12
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_user_counts(apps, schema_editor):
+    """
+    Preenche UserCount com os totais atuais de User, uma linha por role e
+    situação.
+    """
+    User = apps.get_model('core', 'User')
+    UserCount = apps.get_model('core', 'UserCount')
+    alias = schema_editor.connection.alias
+    totals = {
+        (row['role'], row['is_active']): row['total']
+        for row in User.objects.using(alias).order_by().values('role', 'is_active').annotate(total=Count('pk'))
+    }
+    roles = [role for role, _ in User._meta.get_field('role').choices]
+    UserCount.objects.using(alias).bulk_create([
+        UserCount(role=role, is_active=is_active, count=totals.get((role, is_active), 0))
+        for role in roles
+        for is_active in (True, False)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_user_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('client', 'Client'), ('collaborator', 'Collaborator'), ('admin', 'Admin')], max_length=12)),
+                ('is_active', models.BooleanField()),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'UserCount',
+                'constraints': [models.UniqueConstraint(fields=('role', 'is_active'), name='unique_user_count')],
+            },
+        ),
+        migrations.RunPython(populate_user_counts, migrations.RunPython.noop),
+    ]
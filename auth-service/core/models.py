@@ -1,9 +1,14 @@
 import uuid
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.utils.translation import gettext_lazy as _
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models.functions import Lower
 from .managers import UserManager
 
+# Permite consultar por ``email__lower``, que usa o índice único em
+# Lower("email")
+models.EmailField.register_lookup(Lower)
+
 # Tipos de usuários disponíveis
 TYPES_USER_CHOICES = [
     ("client", _("Client")),
@@ -23,17 +28,72 @@ class User(AbstractBaseUser, PermissionsMixin):
     role = models.CharField(
         max_length=12, choices=TYPES_USER_CHOICES, default="client"
     )
+    # Incrementado para revogar todos os tokens já emitidos para o usuário
+    token_version = models.PositiveIntegerField(default=0)
     
     class Meta:
         db_table = "User"
-        ordering = ["role"]
+        ordering = ["role", "user_id"]
         verbose_name = "User"
         verbose_name_plural = "Users"
+        indexes = [
+            # Ordenação padrão e paginação por cursor da listagem
+            models.Index(fields=["role", "user_id"], name="user_role_user_id_idx"),
+            # Contagens de usuários ativos por role
+            models.Index(
+                fields=["role"],
+                condition=models.Q(is_active=True),
+                name="user_active_role_idx",
+            ),
+        ]
+        constraints = [
+            # Garante no banco que só existe um único admin no sistema
+            models.UniqueConstraint(
+                fields=["role"],
+                condition=models.Q(role="admin"),
+                name="unique_admin",
+            ),
+            # E-mails são únicos sem diferenciar maiúsculas e minúsculas
+            models.UniqueConstraint(
+                Lower("email"),
+                name="unique_email_lower",
+            ),
+        ]
         
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["role"]
     
     objects = UserManager()
     
+    def save(self, *args, **kwargs):
+        # O INSERT/UPDATE e o ajuste de UserCount feito no post_save
+        # (core/signals.py) são gravados juntos: em autocommit, uma falha
+        # entre os dois desalinharia as contagens. Dentro de uma transação,
+        # nenhum savepoint é criado.
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.user_id} - {self.email}"
+
+
+class UserCount(models.Model):
+    """
+    Total de usuários por role e situação (ativo/inativo), mantido
+    incrementalmente pelos sinais de User (core/stats.py). Escritas que não
+    disparam sinais, como ``QuerySet.update()``, são corrigidas pelo comando
+    ``rebuild_user_counts``.
+    """
+    role = models.CharField(max_length=12, choices=TYPES_USER_CHOICES)
+    is_active = models.BooleanField()
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "UserCount"
+        constraints = [
+            models.UniqueConstraint(fields=["role", "is_active"], name="unique_user_count"),
+        ]
+
+    def __str__(self):
+        return f"{self.role} ({'ativos' if self.is_active else 'inativos'}): {self.count}"
@@ -0,0 +1,21 @@
+from prometheus_client import generate_latest
+from rest_framework.renderers import BaseRenderer
+
+
+class PrometheusRenderer(BaseRenderer):
+    """
+    Renderiza um registry do prometheus_client no formato de texto do
+    Prometheus. Respostas de erro do DRF (``{'detail': ...}``, como o 403
+    sem METRICS_TOKEN) saem como texto simples.
+    """
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not hasattr(data, 'collect'):
+            detail = data.get('detail', data) if isinstance(data, dict) else data
+            return f'{detail}\n'.encode(self.charset)
+        return generate_latest(data)
@@ -0,0 +1,144 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from .cache import token_version_cache, token_version_cache_key, user_cache, user_cache_key
+from .metrics import count_query
+from .models import User
+from .stats import COUNTED_FIELDS, apply_count_deltas, counted_state
+
+
+@receiver(post_save, sender=User, dispatch_uid='core.invalidate_user_cache.save')
+@receiver(post_delete, sender=User, dispatch_uid='core.invalidate_user_cache.delete')
+def invalidate_user_cache(sender, instance, **kwargs):
+    """
+    Remove o usuário do cache de leitura ao ser alterado ou excluído.
+
+    A remoção é repetida após o commit para descartar uma entrada antiga que
+    uma leitura concorrente tenha gravado antes da transação terminar.
+    """
+    key = user_cache_key(instance.pk)
+    user_cache().delete(key)
+    transaction.on_commit(lambda: user_cache().delete(key))
+
+
+@receiver(post_save, sender=User, dispatch_uid='core.invalidate_token_version.save')
+@receiver(post_delete, sender=User, dispatch_uid='core.invalidate_token_version.delete')
+def invalidate_token_version(sender, instance, **kwargs):
+    """
+    Remove o token_version em cache, de modo que revogações e desativações
+    feitas via save() valham imediatamente neste processo.
+    """
+    key = token_version_cache_key(instance.pk)
+    token_version_cache().delete(key)
+    transaction.on_commit(lambda: token_version_cache().delete(key))
+
+
+# Campos copiados para as claims do token (api/tokens.py): alterá-los revoga
+# os tokens já emitidos, que de outra forma valeriam com as claims antigas
+# até expirar
+TOKEN_CLAIM_FIELDS = ('role', 'is_staff', 'is_active')
+
+
+def password_changed(instance, update_fields):
+    """Se o save() grava uma senha definida com set_password()."""
+    return instance._password is not None and (update_fields is None or 'password' in update_fields)
+
+
+@receiver(pre_save, sender=User, dispatch_uid='core.load_stored_user')
+def load_stored_user(sender, instance, update_fields=None, using=None, **kwargs):
+    """
+    Lê da linha gravada, numa única consulta, os valores que os receivers
+    seguintes comparam com o save(): o token_version, as claims do token e
+    os campos de UserCount. Saves que não tocam nenhum deles (último login,
+    hash atualizado no login) não consultam o banco.
+    """
+    instance._stored_user = None
+    if instance._state.adding:
+        return
+    fields = {field for field in TOKEN_CLAIM_FIELDS if update_fields is None or field in update_fields}
+    if update_fields is None or set(update_fields) & set(COUNTED_FIELDS):
+        fields.update(COUNTED_FIELDS)
+    if not fields and not password_changed(instance, update_fields):
+        return
+    instance._stored_user = (
+        User.objects.using(using).filter(pk=instance.pk).values('token_version', *fields).first()
+    )
+
+
+@receiver(pre_save, sender=User, dispatch_uid='core.revoke_tokens_on_change')
+def revoke_tokens_on_change(sender, instance, raw=False, update_fields=None, using=None, **kwargs):
+    """
+    Incrementa o token_version quando o save() altera role, is_staff ou
+    is_active em relação à linha gravada, ou grava uma senha definida com
+    set_password(), por qualquer caminho (admin, changepassword, shell,
+    views).
+
+    A atualização do hash no login não passa por aqui: o check_password do
+    Django limpa ``_password`` e o login assíncrono atribui o hash direto.
+    """
+    stored = instance._stored_user
+    if raw or stored is None:
+        return
+    fields = [field for field in TOKEN_CLAIM_FIELDS if update_fields is None or field in update_fields]
+    if not password_changed(instance, update_fields) and all(
+        getattr(instance, field) == stored[field] for field in fields
+    ):
+        return
+    # Quem chama já incrementou (ex.: token_version = F(...) + 1)
+    if instance.token_version != stored['token_version']:
+        return
+    if update_fields is not None and 'token_version' not in update_fields:
+        User.objects.using(using).filter(pk=instance.pk).update(token_version=F('token_version') + 1)
+    instance.token_version = stored['token_version'] + 1
+
+
+@receiver(post_save, sender=User, dispatch_uid='core.user_counts.save')
+def update_user_counts_on_save(sender, instance, created, update_fields=None, using=None, **kwargs):
+    """
+    Atualiza UserCount quando um usuário é criado ou muda de role ou de
+    situação, comparando com a linha lida em load_stored_user. Roda na
+    mesma transação do save() (User.save). Saves que não tocam esses campos
+    (último login, senha) não custam nenhuma consulta extra.
+    """
+    if update_fields is not None and not set(update_fields) & set(COUNTED_FIELDS):
+        return
+    stored = None if created else instance._stored_user
+    previous = None if stored is None else tuple(stored[field] for field in COUNTED_FIELDS)
+    # Campos fora de update_fields continuam com o valor gravado
+    current = tuple(
+        stored[field] if stored is not None and update_fields is not None and field not in update_fields
+        else getattr(instance, field)
+        for field in COUNTED_FIELDS
+    )
+    if previous != current:
+        deltas = {current: 1}
+        if previous is not None:
+            deltas[previous] = -1
+        apply_count_deltas(deltas, using=using)
+
+
+@receiver(pre_delete, sender=User, dispatch_uid='core.user_counts.pre_delete')
+def load_deleted_user_state(sender, instance, using=None, **kwargs):
+    """
+    Carrega role e is_active do usuário obtido sem eles (``only()``), que
+    já não poderiam ser lidos depois da exclusão.
+    """
+    if counted_state(instance) is None:
+        instance.refresh_from_db(using=using, fields=COUNTED_FIELDS)
+
+
+@receiver(post_delete, sender=User, dispatch_uid='core.user_counts.delete')
+def update_user_counts_on_delete(sender, instance, using=None, **kwargs):
+    apply_count_deltas({counted_state(instance): -1}, using=using)
+
+
+@receiver(connection_created, dispatch_uid='core.count_queries')
+def install_query_counter(sender, connection, **kwargs):
+    """
+    Conta as consultas de cada conexão para a métrica auth_request_queries.
+    O wrapper sobrevive às reconexões, então é instalado uma única vez.
+    """
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
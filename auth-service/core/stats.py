@@ -0,0 +1,104 @@
+from collections import Counter
+from django.db import transaction
+from django.db.models import Count, F
+from .models import TYPES_USER_CHOICES, User, UserCount
+
+# Campos que definem a linha de UserCount de um usuário
+COUNTED_FIELDS = ('role', 'is_active')
+
+
+def counted_state(user):
+    """
+    ``(role, is_active)`` do usuário, ou ``None`` se algum dos campos não
+    foi carregado (``only()``/``defer()``), para não disparar uma consulta.
+    """
+    values = user.__dict__
+    if not all(field in values for field in COUNTED_FIELDS):
+        return None
+    return tuple(values[field] for field in COUNTED_FIELDS)
+
+
+def apply_count_deltas(deltas, using=None):
+    """
+    Soma ``{(role, is_active): delta}`` às linhas de UserCount com
+    ``UPDATE ... SET count = count + delta``, sem ler o valor atual.
+
+    As linhas são atualizadas sempre na mesma ordem, então dois saves que
+    movem usuários entre as mesmas linhas em sentidos opostos não se
+    bloqueiam em deadlock. Cada linha fica bloqueada até o fim da
+    transação: cadastros concorrentes da mesma role e situação gravam um
+    de cada vez nesse trecho.
+    """
+    counts = UserCount.objects.using(using)
+    for (role, is_active), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        if not counts.filter(role=role, is_active=is_active).update(count=F('count') + delta):
+            counts.get_or_create(role=role, is_active=is_active)
+            counts.filter(role=role, is_active=is_active).update(count=F('count') + delta)
+
+
+def count_created_users(users, using=None):
+    """
+    Conta usuários inseridos com ``bulk_create``, que não dispara post_save.
+    """
+    apply_count_deltas(Counter((user.role, user.is_active) for user in users), using=using)
+
+
+def rebuild_user_counts(using=None):
+    """
+    Recalcula UserCount a partir da tabela User e retorna as diferenças
+    encontradas, ``{(role, is_active): (contado, real)}``.
+
+    As linhas de UserCount ficam bloqueadas durante a contagem, então as
+    atualizações dos cadastros concorrentes são aplicadas depois dela, sem
+    se perderem.
+    """
+    with transaction.atomic(using=using):
+        stored = {
+            (row.role, row.is_active): row.count
+            for row in UserCount.objects.using(using).select_for_update()
+        }
+        actual = {
+            (row['role'], row['is_active']): row['total']
+            for row in User.objects.using(using).order_by()
+            .values('role', 'is_active').annotate(total=Count('pk'))
+        }
+        keys = {(role, is_active) for role, _ in TYPES_USER_CHOICES for is_active in (True, False)}
+        drift = {
+            key: (stored.get(key, 0), actual.get(key, 0))
+            for key in sorted(keys | stored.keys() | actual.keys())
+            if stored.get(key) != actual.get(key, 0)
+        }
+        for (role, is_active), (_, total) in drift.items():
+            UserCount.objects.using(using).update_or_create(
+                role=role, is_active=is_active, defaults={'count': total},
+            )
+    return drift
+
+
+def admin_exists():
+    """
+    Se já existe um admin, ativo ou não, segundo UserCount. A constraint
+    unique_admin continua sendo a garantia; isto só evita o INSERT que
+    falharia.
+    """
+    return UserCount.objects.filter(role='admin', count__gt=0).exists()
+
+
+def get_user_stats():
+    """
+    Totais de usuários por role e situação, lidos de UserCount (uma linha
+    por role e situação, independente do número de usuários).
+    """
+    roles = {role: {'active': 0, 'inactive': 0, 'total': 0} for role, _ in TYPES_USER_CHOICES}
+    for role, is_active, count in UserCount.objects.values_list('role', 'is_active', 'count'):
+        stats = roles.setdefault(role, {'active': 0, 'inactive': 0, 'total': 0})
+        stats['active' if is_active else 'inactive'] += count
+        stats['total'] += count
+    return {
+        'total': sum(stats['total'] for stats in roles.values()),
+        'active': sum(stats['active'] for stats in roles.values()),
+        'inactive': sum(stats['inactive'] for stats in roles.values()),
+        'roles': roles,
+    }
@@ -0,0 +1,77 @@
+import time
+import pytest
+from core.cache import LRUCache, user_cache, user_cache_key
+from core.factories import UserFactory
+
+
+def make_cache(name, **options):
+    return LRUCache(name, {'TIMEOUT': 60, 'OPTIONS': options})
+
+
+class TestLRUCache:
+    """Testes para o backend LRUCache"""
+
+    def test_set_and_get(self):
+        """Testa gravação e leitura de um valor"""
+        cache = make_cache('test-set-get')
+        value = {'role': 'client'}
+        cache.set('key', value)
+        assert cache.get('key') is value
+
+    def test_evicts_least_recently_used(self):
+        """Testa que o item usado há mais tempo é descartado"""
+        cache = make_cache('test-lru', MAX_ENTRIES=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+
+    def test_expired_entries_are_not_returned(self):
+        """Testa que entradas expiradas não são retornadas"""
+        cache = make_cache('test-ttl')
+        cache.set('key', 'value', timeout=0.01)
+        time.sleep(0.02)
+        assert cache.get('key') is None
+        assert not cache.has_key('key')
+
+    def test_add_only_sets_missing_keys(self):
+        """Testa que add não sobrescreve valores existentes"""
+        cache = make_cache('test-add')
+        assert cache.add('key', 1)
+        assert not cache.add('key', 2)
+        assert cache.get('key') == 1
+
+    def test_get_many_returns_only_present_keys(self):
+        """Testa que get_many devolve só as chaves presentes"""
+        cache = make_cache('test-many')
+        cache.set_many({'a': 1, 'b': 2})
+        assert cache.get_many(['a', 'b', 'c']) == {'a': 1, 'b': 2}
+
+    def test_store_is_shared_between_instances(self):
+        """Testa que instâncias com o mesmo nome compartilham os dados"""
+        make_cache('test-shared').set('key', 'value')
+        assert make_cache('test-shared').get('key') == 'value'
+
+
+@pytest.mark.django_db
+class TestUserCacheInvalidation:
+    """Testes para a invalidação do cache de usuários"""
+
+    def test_save_invalidates_user_entry(self):
+        """Testa que salvar o usuário remove a entrada do cache"""
+        user = UserFactory()
+        user_cache().set(user_cache_key(user.pk), 'stale')
+        user.role = 'collaborator'
+        user.save()
+        assert user_cache().get(user_cache_key(user.pk)) is None
+
+    def test_delete_invalidates_user_entry(self):
+        """Testa que excluir o usuário remove a entrada do cache"""
+        user = UserFactory()
+        key = user_cache_key(user.pk)
+        user_cache().set(key, 'stale')
+        user.delete()
+        assert user_cache().get(key) is None
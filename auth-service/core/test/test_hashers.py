@@ -0,0 +1,96 @@
+import io
+import json
+import pytest
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.management import call_command
+from core.factories import UserFactory
+from core.hashers import TunedPBKDF2PasswordHasher, TunedScryptPasswordHasher, must_upgrade
+from core.models import User
+
+
+@pytest.fixture
+def fast_hashers(settings):
+    settings.PASSWORD_HASHER_PARAMS = {
+        **settings.PASSWORD_HASHER_PARAMS,
+        'PBKDF2_ITERATIONS': 1000,
+        'SCRYPT_WORK_FACTOR': 2 ** 10,
+    }
+
+
+class TestTunedHashers:
+    """Testes para os hashers com custo ajustável"""
+
+    def test_pbkdf2_uses_configured_iterations(self, fast_hashers):
+        """Testa que o PBKDF2 usa as iterações configuradas"""
+        encoded = make_password('secret')
+
+        assert encoded.startswith('pbkdf2_sha256$1000$')
+        assert isinstance(identify_hasher(encoded), TunedPBKDF2PasswordHasher)
+
+    def test_must_upgrade_on_cost_change(self, fast_hashers):
+        """Testa que hashes com outro custo precisam ser refeitos"""
+        current = make_password('secret')
+        old = TunedPBKDF2PasswordHasher().encode('secret', 'salt' * 6, iterations=2000)
+
+        assert not must_upgrade(current)
+        assert must_upgrade(old)
+
+    def test_must_upgrade_on_profile_change(self, fast_hashers, settings):
+        """Testa que hashes de outro algoritmo precisam ser refeitos"""
+        encoded = make_password('secret')
+        settings.PASSWORD_HASHERS = [
+            'core.hashers.TunedScryptPasswordHasher',
+            'core.hashers.TunedPBKDF2PasswordHasher',
+        ]
+
+        assert must_upgrade(encoded)
+        assert make_password('secret').startswith('scrypt$')
+
+    def test_scrypt_verifies_costlier_hash_after_lowering_cost(self, fast_hashers, settings):
+        """Testa que um hash scrypt mais caro continua válido após reduzir o custo"""
+        settings.PASSWORD_HASHER_PARAMS = {**settings.PASSWORD_HASHER_PARAMS, 'SCRYPT_WORK_FACTOR': 2 ** 12}
+        hasher = TunedScryptPasswordHasher()
+        encoded = hasher.encode('secret', hasher.salt())
+        settings.PASSWORD_HASHER_PARAMS = {**settings.PASSWORD_HASHER_PARAMS, 'SCRYPT_WORK_FACTOR': 2 ** 10}
+        settings.PASSWORD_HASHERS = ['core.hashers.TunedScryptPasswordHasher']
+
+        assert hasher.verify('secret', encoded)
+        assert not hasher.verify('wrong', encoded)
+        assert must_upgrade(encoded)
+
+    def test_unusable_password_is_not_upgraded(self):
+        """Testa que senhas inutilizáveis são ignoradas"""
+        assert not must_upgrade(make_password(None))
+
+
+@pytest.mark.django_db
+class TestHasherReportCommand:
+    """Testes para o comando hasher_report"""
+
+    def test_reports_users_per_hasher(self, fast_hashers):
+        """Testa a contagem de usuários por hasher e parâmetros"""
+        UserFactory(email='current@example.com')
+        old = UserFactory(email='old@example.com')
+        User.objects.filter(pk=old.pk).update(
+            password=TunedPBKDF2PasswordHasher().encode('secret', 'salt' * 6, iterations=2000)
+        )
+        User.objects.filter(email='current@example.com').update(password=make_password('secret'))
+        UserFactory(email='unusable@example.com')
+        User.objects.filter(email='unusable@example.com').update(password=make_password(None))
+        out = io.StringIO()
+
+        call_command('hasher_report', '--json', stdout=out)
+
+        rows = {(row['algorithm'], row['params']): row for row in json.loads(out.getvalue())}
+        assert rows[('pbkdf2_sha256', 'iterations=1000')]['must_upgrade'] is False
+        assert rows[('pbkdf2_sha256', 'iterations=2000')]['must_upgrade'] is True
+        assert rows[('inutilizável', '')]['users'] == 1
+
+    def test_text_output(self, fast_hashers):
+        """Testa o resumo em texto"""
+        UserFactory()
+        out = io.StringIO()
+
+        call_command('hasher_report', stdout=out)
+
+        assert '1 usuários, 0 com hash a atualizar no próximo login.' in out.getvalue()
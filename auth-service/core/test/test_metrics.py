@@ -0,0 +1,143 @@
+import pytest
+from django.urls import reverse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY
+from rest_framework import status
+from rest_framework.test import APIClient
+from core import metrics
+from core.factories import UserFactory
+
+
+class FakePool:
+    def get_stats(self):
+        return {
+            'pool_min': 2, 'pool_max': 10, 'pool_size': 4,
+            'pool_available': 1, 'requests_waiting': 3, 'connections_num': 7,
+        }
+
+
+class FakeConnection:
+    pool = FakePool()
+
+
+class TestDatabasePoolStats:
+    """Testes para database_pool_stats"""
+
+    def test_reports_pool_usage(self, monkeypatch):
+        """Testa o cálculo das conexões em uso, em espera e criadas"""
+        monkeypatch.setattr(metrics, 'connections', {'default': FakeConnection()})
+
+        assert metrics.database_pool_stats() == {
+            'default': {
+                'size': 4, 'available': 1, 'in_use': 3, 'waiting': 3,
+                'created': 7, 'min_size': 2, 'max_size': 10,
+            },
+        }
+
+    def test_database_without_pool(self):
+        """Testa que bancos sem pool aparecem como None"""
+        assert metrics.database_pool_stats() == {'default': None}
+
+
+@pytest.mark.django_db
+class TestMetricsView:
+    """Testes para MetricsView"""
+
+    def test_returns_metrics(self):
+        """Testa que o endpoint publica o pool e as fontes registradas"""
+        response = APIClient().get(reverse('metrics'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['database_pools'] == {'default': None}
+        assert 'login_rate_limit' in response.json()
+
+    def test_requires_token_when_configured(self, settings):
+        """Testa que METRICS_TOKEN protege o endpoint"""
+        settings.METRICS_TOKEN = 'secret'
+        client = APIClient()
+
+        assert client.get(reverse('metrics')).status_code == status.HTTP_403_FORBIDDEN
+        client.credentials(HTTP_AUTHORIZATION='Bearer secret')
+        assert client.get(reverse('metrics')).status_code == status.HTTP_200_OK
+
+
+    def test_is_documented(self):
+        """Testa que o endpoint aparece no schema com os dois formatos de resposta"""
+        from drf_spectacular.generators import SchemaGenerator
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+        content = schema['paths']['/metrics']['get']['responses']['200']['content']
+
+        assert content['application/json']['schema']['type'] == 'object'
+        assert content['text/plain']['schema']['type'] == 'string'
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.django_db
+class TestPrometheusMetrics:
+    """Testes para as métricas no formato do Prometheus"""
+
+    def test_login_records_stages(self, client):
+        """Testa os histogramas de etapas, consultas e verificação de senha do login"""
+        user = UserFactory()
+        stages = ('rate_limit', 'lookup', 'check_password', 'tokens', 'render')
+        before = {stage: sample('auth_stage_seconds_count', endpoint='login', stage=stage) for stage in stages}
+        queries = sample('auth_request_queries_sum', endpoint='login')
+        verifications = sample('auth_password_verify_seconds_count', algorithm='pbkdf2_sha256')
+
+        response = client.post(
+            reverse('login'), {'email': user.email, 'password': 'testpass123'}, content_type='application/json'
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        for stage in stages:
+            assert sample('auth_stage_seconds_count', endpoint='login', stage=stage) == before[stage] + 1
+        assert sample('auth_request_queries_sum', endpoint='login') > queries
+        assert sample('auth_password_verify_seconds_count', algorithm='pbkdf2_sha256') == verifications + 1
+
+    def test_async_login_counts_queries(self, client):
+        """Testa que as consultas do ORM assíncrono entram na contagem da requisição"""
+        user = UserFactory()
+        requests = sample('auth_request_queries_count', endpoint='login-async')
+        queries = sample('auth_request_queries_sum', endpoint='login-async')
+
+        client.post(
+            reverse('login-async'), {'email': user.email, 'password': 'testpass123'}, content_type='application/json'
+        )
+
+        assert sample('auth_request_queries_count', endpoint='login-async') == requests + 1
+        assert sample('auth_request_queries_sum', endpoint='login-async') >= queries + 1
+
+    def test_prometheus_format(self):
+        """Testa a negociação do formato de texto do Prometheus"""
+        client = APIClient()
+        client.get(reverse('users'))
+
+        response = client.get(reverse('metrics'), HTTP_ACCEPT='text/plain;version=0.0.4;q=0.5,*/*;q=0.1')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == CONTENT_TYPE_LATEST
+        assert 'auth_request_seconds_bucket{endpoint="users"' in response.content.decode()
+        assert client.get(reverse('metrics'), {'format': 'prometheus'}).status_code == status.HTTP_200_OK
+
+    def test_prometheus_format_without_token(self, settings):
+        """Testa que a coleta sem METRICS_TOKEN no formato do Prometheus recebe 403"""
+        settings.METRICS_TOKEN = 'secret'
+        client = APIClient()
+
+        for params, headers in (({}, {'HTTP_ACCEPT': 'text/plain'}), ({'format': 'prometheus'}, {})):
+            response = client.get(reverse('metrics'), params, **headers)
+
+            assert response.status_code == status.HTTP_403_FORBIDDEN
+            assert response['Content-Type'].startswith('text/plain')
+            assert response.content.decode().strip()
+
+    def test_multiprocess_registry(self, tmp_path, monkeypatch):
+        """Testa que PROMETHEUS_MULTIPROC_DIR ativa a coleta somada entre processos"""
+        monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+
+        registry = metrics.prometheus_registry()
+
+        assert registry is not REGISTRY
+        assert list(registry.collect()) == []
@@ -1,5 +1,5 @@
 import pytest
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from core.models import User
 from core.factories import UserFactory, AdminUserFactory, CollaboratorUserFactory
 
@@ -43,6 +43,27 @@ class TestUserModel:
         with pytest.raises(IntegrityError):
             User.objects.create_user(email='duplicate@example.com', password='password123')
 
+    def test_email_is_stored_in_lowercase(self):
+        """Testa que o e-mail é gravado inteiro em minúsculas"""
+        user = User.objects.create_user(email='Mixed.Case@Example.COM', password='password123')
+        assert user.email == 'mixed.case@example.com'
+
+    def test_email_uniqueness_ignores_case(self):
+        """Testa que o banco rejeita e-mails que diferem só na caixa"""
+        UserFactory(email='duplicate@example.com')
+
+        with pytest.raises(IntegrityError), transaction.atomic():
+            User.objects.bulk_create([User(email='Duplicate@Example.com')])
+
+    def test_lookup_by_email_ignores_case(self, django_assert_num_queries):
+        """Testa a busca por e-mail sem diferenciar maiúsculas e minúsculas"""
+        user = UserFactory(email='user@example.com')
+
+        with django_assert_num_queries(1) as queries:
+            assert User.objects.by_email('USER@example.com').get() == user
+        assert 'LOWER' in queries.captured_queries[0]['sql'].upper()
+        assert User.objects.get_by_natural_key('User@Example.com') == user
+
     def test_user_string_representation(self):
         """Testa representação string do usuário"""
         user = UserFactory(email='test@example.com')
@@ -64,6 +85,12 @@ class TestUserModel:
         assert collaborator.role == 'collaborator'
         assert admin.role == 'admin'
 
+    def test_only_one_admin_allowed(self):
+        """Testa que o banco rejeita um segundo admin"""
+        AdminUserFactory()
+        with pytest.raises(IntegrityError), transaction.atomic():
+            User.objects.create_user(email='admin2@example.com', password='pass123', role='admin')
+
     def test_user_default_values(self):
         """Testa valores padrão do usuário"""
         user = User.objects.create_user(
@@ -80,9 +107,147 @@ class TestUserModel:
         assert user.password != 'testpass123'
         assert user.password.startswith('pbkdf2_sha256$')
 
+    def test_factory_batch_uses_single_insert(self, django_assert_num_queries):
+        """Testa que create_batch insere em lote com um único hash de senha"""
+        with django_assert_num_queries(1):
+            users = UserFactory.create_batch(5)
+
+        assert User.objects.count() == 5
+        assert len({user.password for user in users}) == 1
+        assert users[0].check_password('testpass123')
+
     def test_user_permissions_mixin(self):
         """Testa que o usuário herda de PermissionsMixin"""
         user = UserFactory()
         assert hasattr(user, 'is_superuser')
         assert hasattr(user, 'groups')
-        assert hasattr(user, 'user_permissions')
\ No newline at end of file
+        assert hasattr(user, 'user_permissions')
+
+@pytest.mark.django_db
+class TestTokenRevocationOnSave:
+    """Testes para a revogação de tokens quando as claims mudam"""
+
+    def test_role_change_bumps_token_version(self):
+        """Testa que mudar a role via save() revoga os tokens"""
+        user = AdminUserFactory()
+        user.role = 'collaborator'
+        user.is_staff = False
+        user.save()
+
+        user.refresh_from_db()
+        assert user.token_version == 1
+
+    def test_update_fields_change_bumps_token_version(self):
+        """Testa a revogação com update_fields sem token_version"""
+        user = UserFactory()
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+
+        assert user.token_version == 1
+        user.refresh_from_db()
+        assert user.token_version == 1
+
+    def test_unchanged_claims_keep_token_version(self, django_assert_num_queries):
+        """Testa que saves sem mudança nas claims não revogam os tokens"""
+        user = UserFactory()
+        user.save()
+        with django_assert_num_queries(1):
+            user.save(update_fields=['last_login'])
+
+        user.refresh_from_db()
+        assert user.token_version == 0
+
+    def test_set_password_bumps_token_version(self):
+        """Testa que redefinir a senha com set_password() revoga os tokens"""
+        user = UserFactory()
+        user.set_password('NewSecurePass123!')
+        user.save()
+
+        user.refresh_from_db()
+        assert user.token_version == 1
+
+    def test_password_hash_upgrade_keeps_token_version(self):
+        """Testa que a atualização do hash no login não revoga os tokens"""
+        from django.contrib.auth.hashers import PBKDF2SHA1PasswordHasher, make_password
+        user = UserFactory()
+        User.objects.filter(pk=user.pk).update(password=make_password('testpass123', hasher=PBKDF2SHA1PasswordHasher()))
+        user.refresh_from_db()
+
+        assert user.check_password('testpass123')
+        user.refresh_from_db()
+        assert user.password.startswith('pbkdf2_sha256$')
+        assert user.token_version == 0
+
+    def test_explicit_bump_is_not_doubled(self):
+        """Testa que um incremento feito por quem chama não é repetido"""
+        from django.db.models import F
+        user = UserFactory()
+        user.role = 'collaborator'
+        user.token_version = F('token_version') + 1
+        user.save()
+
+        user.refresh_from_db()
+        assert user.token_version == 1
+
+@pytest.mark.django_db
+class TestCanonicalizeEmailsMigration:
+    """Testes para a migração que deixa os e-mails em minúsculas"""
+
+    def test_lowercases_and_deduplicates(self):
+        """Testa que duplicados por caixa são desativados, preservando o admin"""
+        from importlib import import_module
+        from types import SimpleNamespace
+        from django.apps import apps
+        from django.db import connection
+
+        migration = import_module('core.migrations.0004_email_lower')
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX "unique_email_lower"')
+        User.objects.bulk_create([
+            User(email='Person@Example.com', role='client'),
+            User(email='person@example.com', role='admin'),
+            User(email='Other@Example.com', role='client'),
+        ])
+        migration.canonicalize_emails(apps, SimpleNamespace(connection=connection))
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE UNIQUE INDEX "unique_email_lower" ON "User" (LOWER("email"))')
+
+        admin = User.objects.get(role='admin')
+        assert admin.email == 'person@example.com'
+        assert admin.is_active
+        assert User.objects.get(email='other@example.com').is_active
+        discarded = User.objects.get(is_active=False)
+        assert discarded.email == f'duplicate-{discarded.pk.hex}@invalid'
+
+
+@pytest.mark.django_db
+class TestUniqueAdminMigration:
+    """Testes para a migração que deixa um único admin"""
+
+    def test_demotes_extra_admins(self):
+        """Testa que só o admin com o login mais recente é mantido"""
+        from datetime import timedelta
+        from importlib import import_module
+        from types import SimpleNamespace
+        from django.apps import apps
+        from django.db import connection
+        from django.utils import timezone
+
+        migration = import_module('core.migrations.0003_unique_admin')
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX "unique_admin"')
+        now = timezone.now()
+        User.objects.bulk_create([
+            User(email='old@example.com', role='admin', is_staff=True, last_login=now - timedelta(days=1)),
+            User(email='recent@example.com', role='admin', is_staff=True, last_login=now),
+            User(email='never@example.com', role='admin', is_staff=True),
+        ])
+        migration.demote_extra_admins(apps, SimpleNamespace(connection=connection))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE UNIQUE INDEX "unique_admin" ON "User" ("role") WHERE "role" = \'admin\''
+            )
+
+        assert User.objects.get(role='admin').email == 'recent@example.com'
+        demoted = User.objects.filter(email__in=['old@example.com', 'never@example.com'])
+        assert {(user.role, user.is_staff, user.token_version) for user in demoted} == {('collaborator', False, 1)}
@@ -0,0 +1,157 @@
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from api.tokens import RefreshToken
+from core.cache import get_token_version
+from core.models import User
+
+SEED_USERS = 2000
+
+
+def explain(sql):
+    """
+    Plano de execução de uma consulta já com os parâmetros interpolados.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('EXPLAIN ' + sql)
+            return [row[0] for row in cursor.fetchall()]
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def sequential_scans(plan):
+    """
+    Linhas do plano que leem a tabela User inteira sem usar um índice.
+    """
+    if connection.vendor == 'postgresql':
+        return [line for line in plan if 'Seq Scan on "User"' in line]
+    return [line for line in plan if line.startswith('SCAN User') and 'INDEX' not in line]
+
+
+def sorts(plan):
+    """
+    Linhas do plano que ordenam o resultado fora de um índice.
+    """
+    if connection.vendor == 'postgresql':
+        return [line for line in plan if line.strip().lstrip('-> ').startswith(('Sort', 'Incremental Sort'))]
+    return [line for line in plan if 'TEMP B-TREE' in line]
+
+
+@pytest.fixture
+def seeded_users(db):
+    encoded = make_password('testpass123')
+    roles = ('client', 'collaborator')
+    User.objects.bulk_create([
+        User(email=f'user{i}@example.com', role=roles[i % 2], is_active=i % 10 != 0, password=encoded)
+        for i in range(SEED_USERS)
+    ])
+    admin = User.objects.create(email='admin@example.com', role='admin', is_staff=True, password=encoded)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+        if connection.vendor == 'postgresql':
+            # Uma Seq Scan só aparece no plano se não houver índice utilizável;
+            # SET LOCAL vale até o rollback da transação do teste
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    return admin
+
+
+def admin_client(admin):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+    return client
+
+
+def captured_plans(func):
+    with CaptureQueriesContext(connection) as queries:
+        func()
+    statements = [
+        query['sql'] for query in queries
+        if '"User"' in query['sql'] and query['sql'].lstrip().upper().startswith(('SELECT', 'UPDATE'))
+    ]
+    assert statements, "Nenhuma consulta à tabela User foi capturada"
+    return {sql: explain(sql) for sql in statements}
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+    """Testa que as consultas da API à tabela User usam índices"""
+
+    def assert_no_sequential_scan(self, func):
+        plans = captured_plans(func)
+        for sql, plan in plans.items():
+            assert not sequential_scans(plan), f"Leitura sequencial em:\n{sql}\n" + "\n".join(plan)
+        return plans
+
+    def test_detects_sequential_scan(self, seeded_users):
+        """Testa que a verificação detecta uma consulta sem índice"""
+        assert sequential_scans(explain('SELECT * FROM "User" WHERE "is_staff"'))
+
+    def test_login(self, seeded_users):
+        """Testa a busca do usuário no login"""
+        data = {'email': 'User7@Example.com', 'password': 'testpass123'}
+        self.assert_no_sequential_scan(lambda: APIClient().post(reverse('login'), data, format='json'))
+
+    def test_user_list_pages(self, seeded_users):
+        """Testa a primeira página e a seguinte da listagem, sem ordenação fora do índice"""
+        client = admin_client(seeded_users)
+
+        def list_pages():
+            response = client.get(reverse('users'), {'page_size': 50})
+            client.get(response.data['next'])
+
+        plans = self.assert_no_sequential_scan(list_pages)
+        for sql, plan in plans.items():
+            if 'LIMIT' in sql:
+                assert not sorts(plan), f"Ordenação fora do índice em:\n{sql}\n" + "\n".join(plan)
+
+    def test_user_list_stream(self, seeded_users):
+        """Testa a exportação NDJSON"""
+        client = admin_client(seeded_users)
+        self.assert_no_sequential_scan(lambda: b''.join(client.get(reverse('users'), {'format': 'ndjson'}).streaming_content))
+
+    def test_user_retrieve(self, seeded_users):
+        """Testa a leitura de um usuário"""
+        user = User.objects.get(email='user3@example.com')
+        client = admin_client(seeded_users)
+        self.assert_no_sequential_scan(lambda: client.get(reverse('user', kwargs={'pk': user.pk})))
+
+    def test_token_version_lookup(self, seeded_users):
+        """Testa a consulta do token_version usada na autenticação e na introspecção"""
+        user = User.objects.get(email='user3@example.com')
+        self.assert_no_sequential_scan(lambda: get_token_version(user.pk))
+
+    def test_logout_all(self, seeded_users):
+        """Testa o UPDATE da revogação de tokens"""
+        client = admin_client(seeded_users)
+        self.assert_no_sequential_scan(lambda: client.post(reverse('logout-all')))
+
+    def test_register_conflict(self, seeded_users):
+        """Testa o cadastro e o mapeamento de conflito de e-mail"""
+        data = {
+            'email': 'USER5@example.com',
+            'password': 'SecurePass123!',
+            'password2': 'SecurePass123!',
+            'role': 'client'
+        }
+        self.assert_no_sequential_scan(lambda: APIClient().post(reverse('user-register'), data, format='json'))
+
+    def test_bulk_register(self, seeded_users, settings):
+        """Testa as verificações por lote do cadastro em lote"""
+        settings.USER_IMPORT = {**settings.USER_IMPORT, 'HASH_WORKERS': 1}
+        client = admin_client(seeded_users)
+        data = [
+            {'email': 'user1@example.com', 'role': 'client', 'password': 'SecurePass123!'},
+            {'email': 'admin2@example.com', 'role': 'admin', 'password': 'SecurePass123!'},
+        ]
+        self.assert_no_sequential_scan(lambda: client.post(reverse('user-register-bulk'), data, format='json'))
+
+    def test_active_users_per_role(self, seeded_users):
+        """Testa a contagem de usuários ativos por role pelo índice parcial"""
+        self.assert_no_sequential_scan(
+            lambda: list(User.objects.filter(is_active=True).values('role').annotate(total=Count('pk')).order_by())
+        )
@@ -0,0 +1,72 @@
+import importlib
+import runpy
+from types import SimpleNamespace
+import pytest
+from django.conf import settings as django_settings
+from django.core.exceptions import ImproperlyConfigured
+
+GUNICORN_CONF = django_settings.BASE_DIR / 'gunicorn.conf.py'
+
+
+def load_gunicorn_conf(monkeypatch, tmp_path, **environ):
+    # O arquivo define PROMETHEUS_MULTIPROC_DIR no ambiente do processo
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    for name in ('SERVER_MODE', 'WEB_CONCURRENCY'):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in environ.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(str(GUNICORN_CONF))
+
+
+class TestGunicornConf:
+    """Testes para o gunicorn.conf.py"""
+
+    def test_defaults_to_wsgi(self, monkeypatch, tmp_path):
+        """Testa que o modo padrão é WSGI com workers gthread"""
+        conf = load_gunicorn_conf(monkeypatch, tmp_path)
+
+        assert conf['wsgi_app'] == 'setup.wsgi:application'
+        assert conf['worker_class'] == 'gthread'
+
+    def test_asgi_mode(self, monkeypatch, tmp_path):
+        """Testa o modo ASGI com workers do Uvicorn"""
+        conf = load_gunicorn_conf(monkeypatch, tmp_path, SERVER_MODE='asgi')
+
+        assert conf['wsgi_app'] == 'setup.asgi:application'
+        assert conf['worker_class'] == 'uvicorn_worker.UvicornWorker'
+
+    def test_workers_follow_cpu_affinity(self, monkeypatch, tmp_path):
+        """Testa que os workers seguem os núcleos disponíveis ao processo"""
+        monkeypatch.setattr('os.sched_getaffinity', lambda pid: {0})
+        conf = load_gunicorn_conf(monkeypatch, tmp_path)
+
+        assert conf['workers'] == 3
+
+    def test_web_concurrency_overrides_workers(self, monkeypatch, tmp_path):
+        """Testa que WEB_CONCURRENCY define o número de workers"""
+        conf = load_gunicorn_conf(monkeypatch, tmp_path, WEB_CONCURRENCY='7')
+
+        assert conf['workers'] == 7
+
+    def test_worker_refuses_process_local_refresh_cache(self, monkeypatch, tmp_path):
+        """Testa que os workers não sobem com o cache de refresh tokens local a cada processo"""
+        conf = load_gunicorn_conf(monkeypatch, tmp_path)
+        worker = SimpleNamespace(cfg=SimpleNamespace(workers=3))
+
+        with pytest.raises(ImproperlyConfigured):
+            conf['post_worker_init'](worker)
+
+        worker.cfg.workers = 1
+        conf['post_worker_init'](worker)
+
+
+class TestAsgiApplication:
+    """Testes para o setup.asgi"""
+
+    def test_disables_persistent_connections(self, monkeypatch):
+        """Testa que a aplicação ASGI desliga as conexões persistentes"""
+        monkeypatch.setitem(django_settings.DATABASES['default'], 'CONN_MAX_AGE', 60)
+        import setup.asgi
+        importlib.reload(setup.asgi)
+
+        assert django_settings.DATABASES['default']['CONN_MAX_AGE'] == 0
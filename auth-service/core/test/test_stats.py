@@ -0,0 +1,175 @@
+import pytest
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.factories import AdminUserFactory, CollaboratorUserFactory, UserFactory
+from core.models import User, UserCount
+from core.stats import admin_exists, apply_count_deltas, count_created_users, get_user_stats, rebuild_user_counts
+
+
+def counts():
+    return {
+        (row.role, row.is_active): row.count
+        for row in UserCount.objects.all() if row.count
+    }
+
+
+@pytest.mark.django_db
+class TestUserCounts:
+    """Testes para a manutenção incremental de UserCount"""
+
+    def test_create_increments_count(self):
+        """Testa que criar usuários soma na linha da role e situação"""
+        UserFactory()
+        UserFactory(is_active=False)
+        CollaboratorUserFactory()
+
+        assert counts() == {('client', True): 1, ('client', False): 1, ('collaborator', True): 1}
+
+    def test_role_and_status_changes_move_count(self):
+        """Testa que mudar role ou situação move o usuário de linha"""
+        user = UserFactory()
+        user.role = 'collaborator'
+        user.save()
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+
+        assert counts() == {('collaborator', False): 1}
+
+    def test_unrelated_save_does_not_query_counts(self, django_assert_num_queries):
+        """Testa que saves sem role ou is_active não tocam UserCount"""
+        user = UserFactory()
+        with django_assert_num_queries(1):
+            user.save(update_fields=['last_login'])
+
+    def test_deferred_fields_are_loaded_before_save(self):
+        """Testa usuário carregado sem role que muda de role"""
+        user = UserFactory()
+        deferred = User.objects.only('pk').get(pk=user.pk)
+        deferred.role = 'collaborator'
+        deferred.save()
+
+        assert counts() == {('collaborator', True): 1}
+
+    def test_saved_fields_move_count_with_stored_values(self):
+        """Testa que campos fora de update_fields contam com o valor gravado"""
+        user = UserFactory()
+        user.role = 'collaborator'
+        user.is_active = False
+        user.save(update_fields=['role'])
+
+        assert counts() == {('collaborator', True): 1}
+
+    def test_loaded_users_are_not_snapshotted(self):
+        """Testa que carregar usuários não guarda estado para as contagens"""
+        UserFactory.create_batch(2)
+        assert not any(hasattr(user, '_stored_user') for user in User.objects.all())
+
+    def test_delete_decrements_count(self):
+        """Testa que excluir usuários subtrai da contagem"""
+        UserFactory()
+        UserFactory().delete()
+        User.objects.filter(role='client').delete()
+
+        assert counts() == {}
+
+    def test_deferred_user_delete_decrements_count(self):
+        """Testa excluir um usuário carregado sem role"""
+        CollaboratorUserFactory()
+        User.objects.only('pk').get().delete()
+
+        assert counts() == {}
+
+    def test_deltas_update_rows_in_sorted_order(self):
+        """Testa que as linhas são atualizadas sempre na mesma ordem, evitando deadlocks"""
+        UserFactory()
+        CollaboratorUserFactory()
+
+        with CaptureQueriesContext(connection) as queries:
+            apply_count_deltas({('collaborator', True): 1, ('client', True): -1})
+
+        updated = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        assert "'client'" in updated[0] and "'collaborator'" in updated[1]
+        assert counts() == {('collaborator', True): 2}
+
+    def test_bulk_created_users_are_counted_explicitly(self):
+        """Testa count_created_users para inserções com bulk_create"""
+        users = UserFactory.create_batch(3)
+        assert counts() == {}
+
+        count_created_users(users)
+        assert counts() == {('client', True): 3}
+
+    def test_admin_exists(self):
+        """Testa a verificação de admin a partir das contagens"""
+        assert not admin_exists()
+        AdminUserFactory(is_active=False)
+        assert admin_exists()
+
+    def test_get_user_stats(self, django_assert_num_queries):
+        """Testa os totais por role e situação com uma única consulta"""
+        UserFactory()
+        UserFactory(is_active=False)
+        AdminUserFactory()
+
+        with django_assert_num_queries(1):
+            stats = get_user_stats()
+
+        assert stats['total'] == 3
+        assert stats['active'] == 2
+        assert stats['inactive'] == 1
+        assert stats['roles']['client'] == {'active': 1, 'inactive': 1, 'total': 2}
+        assert stats['roles']['collaborator'] == {'active': 0, 'inactive': 0, 'total': 0}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestUserCountsTransaction:
+    """Testes para a gravação conjunta de User e UserCount em autocommit"""
+
+    def test_failed_count_update_rolls_back_user(self):
+        """Testa que uma falha ao contar desfaz o cadastro do usuário"""
+        with patch('core.signals.apply_count_deltas', side_effect=RuntimeError), pytest.raises(RuntimeError):
+            User.objects.create_user(email='user@example.com', password='testpass123', role='client')
+
+        assert not User.objects.exists()
+
+    def test_failed_count_update_rolls_back_role_change(self):
+        """Testa que uma falha ao contar desfaz a mudança de role"""
+        user = UserFactory()
+        user.role = 'collaborator'
+        with patch('core.signals.apply_count_deltas', side_effect=RuntimeError), pytest.raises(RuntimeError):
+            user.save()
+
+        assert User.objects.get(pk=user.pk).role == 'client'
+        assert counts() == {('client', True): 1}
+
+
+@pytest.mark.django_db
+class TestRebuildUserCounts:
+    """Testes para a reconciliação de UserCount"""
+
+    def test_rebuild_fixes_drift(self):
+        """Testa que a reconstrução corrige escritas que não passaram pelos sinais"""
+        UserFactory.create_batch(2)
+        user = UserFactory()
+        User.objects.filter(pk=user.pk).update(is_active=False)
+
+        assert rebuild_user_counts() == {
+            ('client', False): (0, 1),
+            ('client', True): (1, 2),
+        }
+        assert counts() == {('client', True): 2, ('client', False): 1}
+        assert rebuild_user_counts() == {}
+
+    def test_command_reports_corrections(self):
+        """Testa a saída do comando rebuild_user_counts"""
+        UserFactory.create_batch(2)
+        out = StringIO()
+        call_command('rebuild_user_counts', stdout=out)
+        assert '1 contagens corrigidas' in out.getvalue()
+
+        out = StringIO()
+        call_command('rebuild_user_counts', stdout=out)
+        assert 'em dia' in out.getvalue()
@@ -1,3 +1,50 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from prometheus_client import CONTENT_TYPE_LATEST
+from rest_framework.permissions import BasePermission
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .metrics import collect_metrics, prometheus_registry
+from .renderers import PrometheusRenderer
 
-# Create your views here.
+
+class HasMetricsToken(BasePermission):
+    """
+    Exige ``Authorization: Bearer <METRICS_TOKEN>`` quando METRICS_TOKEN
+    estiver configurado.
+    """
+
+    def has_permission(self, request, view):
+        if not settings.METRICS_TOKEN:
+            return True
+        return constant_time_compare(
+            request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {settings.METRICS_TOKEN}'
+        )
+
+
+class MetricsView(APIView):
+    """
+    Métricas de operação: estatísticas do pool de conexões com o banco e
+    das fontes registradas pelos apps.
+
+    Para o Prometheus (``Accept: text/plain`` ou ``?format=prometheus``)
+    publica os histogramas de latência por etapa, consultas por requisição
+    e verificação de senha, somados entre os workers.
+    """
+    authentication_classes = []
+    permission_classes = [HasMetricsToken]
+    renderer_classes = [JSONRenderer, PrometheusRenderer]
+
+    @extend_schema(responses={
+        # Uma chave por fonte registrada (database_pools, login_rate_limit...)
+        (200, 'application/json'): OpenApiTypes.OBJECT,
+        (200, 'text/plain'): OpenApiTypes.STR,
+    })
+    def get(self, request):
+        headers = {'Cache-Control': 'no-store'}
+        if isinstance(request.accepted_renderer, PrometheusRenderer):
+            return Response(prometheus_registry(), headers=headers, content_type=CONTENT_TYPE_LATEST)
+        return Response(collect_metrics(), headers=headers)
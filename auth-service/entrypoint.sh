@@ -2,14 +2,38 @@
 
 set -e
 
-echo "⏳ Waiting for Postgres with pg_isready ($POSTGRES_HOST:$POSTGRES_PORT) ..."
-until pg_isready -h "$POSTGRES_HOST" -p "$POSTGRES_PORT" -U "$POSTGRES_USER" >/dev/null 2>&1; do
-  echo "🟡 Waiting for Postgres Database Startup ($POSTGRES_HOST:$POSTGRES_PORT) ..."
-  sleep 2
-done
+wait_for_postgres() {
+  echo "⏳ Waiting for Postgres with pg_isready ($POSTGRES_HOST:$POSTGRES_PORT) ..."
+  until pg_isready -h "$POSTGRES_HOST" -p "$POSTGRES_PORT" -U "$POSTGRES_USER" >/dev/null 2>&1; do
+    echo "🟡 Waiting for Postgres Database Startup ($POSTGRES_HOST:$POSTGRES_PORT) ..."
+    sleep 2
+  done
 
-echo "✅ Postgres Database Started Successfully ($POSTGRES_HOST:$POSTGRES_PORT)"
+  echo "✅ Postgres Database Started Successfully ($POSTGRES_HOST:$POSTGRES_PORT)"
+}
 
-python manage.py makemigrations --noinput
-python manage.py migrate --noinput
-python manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+# Comandos:
+#   serve      servidor de produção (Gunicorn, ver gunicorn.conf.py)
+#   migrate    aplica as migrações, cria as tabelas dos caches em banco
+#              (DatabaseCache) e termina; rodar uma vez antes do serve
+#   runserver  servidor de desenvolvimento com auto-reload
+case "${1:-serve}" in
+  serve)
+    wait_for_postgres
+    exec gunicorn -c gunicorn.conf.py
+    ;;
+  migrate)
+    wait_for_postgres
+    python manage.py migrate --noinput
+    exec python manage.py createcachetable
+    ;;
+  runserver)
+    wait_for_postgres
+    python manage.py migrate --noinput
+    python manage.py createcachetable
+    exec python manage.py runserver 0.0.0.0:8000
+    ;;
+  *)
+    exec "$@"
+    ;;
+esac
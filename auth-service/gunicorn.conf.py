@@ -0,0 +1,103 @@
+"""
+Configuração do Gunicorn para produção, lida das variáveis de ambiente.
+
+SERVER_MODE escolhe a aplicação servida: 'wsgi' (padrão) roda setup.wsgi em
+workers síncronos com threads; 'asgi' roda setup.asgi em workers do
+Uvicorn, necessário para as views assíncronas. As views mais usadas são
+síncronas e, sob ASGI, cada uma passa por uma thread do sync_to_async, o
+que as deixa mais lentas (benchmarks/bench_async_views.py). Sob ASGI as
+conexões persistentes ficam desligadas (ver setup/asgi.py).
+
+    gunicorn -c gunicorn.conf.py
+
+Um ``kill -HUP`` no processo mestre recarrega o código com troca gradual
+dos workers, sem derrubar conexões em andamento.
+"""
+
+import math
+import os
+import shutil
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+def available_cores():
+    """
+    Núcleos que o processo pode de fato usar: os da afinidade de CPU,
+    limitados pela cota do cgroup v2 (cpu.max) em containers. O
+    cpu_count() conta os núcleos do host e superdimensiona os workers.
+    """
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cores = min(cores, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cores)
+
+
+server_mode = os.environ.get('SERVER_MODE', 'wsgi')
+if server_mode not in ('asgi', 'wsgi'):
+    raise RuntimeError(f"SERVER_MODE inválido: {server_mode!r}")
+
+cores = available_cores()
+
+wsgi_app = f'setup.{server_mode}:application'
+bind = os.environ.get('SERVER_BIND', '0.0.0.0:8000')
+
+# Workers assíncronos mantêm um núcleo ocupado cada um; os síncronos passam
+# parte do tempo esperando o banco, por isso a fórmula 2 * núcleos + 1.
+if server_mode == 'asgi':
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    workers = env_int('WEB_CONCURRENCY', cores)
+else:
+    worker_class = 'gthread'
+    workers = env_int('WEB_CONCURRENCY', 2 * cores + 1)
+    threads = env_int('SERVER_THREADS', 2)
+
+# Carrega o Django uma vez no mestre e compartilha a memória com os workers
+# via fork. Pools de threads e conexões são criados sob demanda, já dentro
+# de cada worker.
+preload_app = env_bool('SERVER_PRELOAD', True)
+
+# Recicla os workers periodicamente, com jitter para não reiniciarem juntos
+max_requests = env_int('SERVER_MAX_REQUESTS', 10000)
+max_requests_jitter = env_int('SERVER_MAX_REQUESTS_JITTER', 1000)
+
+timeout = env_int('SERVER_TIMEOUT', 30)
+graceful_timeout = env_int('SERVER_GRACEFUL_TIMEOUT', 30)
+keepalive = env_int('SERVER_KEEPALIVE', 5)
+
+accesslog = '-' if env_bool('SERVER_ACCESS_LOG', False) else None
+errorlog = '-'
+
+# Métricas do Prometheus somadas entre os workers: cada processo grava as
+# suas em arquivos próprios neste diretório, lidos pelo /metrics. Precisa
+# estar no ambiente antes de o Django carregar o prometheus_client.
+metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus')
+
+
+def on_starting(server):
+    # Descarta os arquivos de uma execução anterior
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def post_worker_init(worker):
+    # O reuso de refresh tokens só é detectado entre workers com um cache
+    # compartilhado; com um cache local o worker não sobe
+    from api.tokens import check_refresh_token_cache
+    check_refresh_token_cache(worker.cfg.workers)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -9,8 +9,17 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'setup.settings')
 
 application = get_asgi_application()
+
+# O Django não suporta conexões persistentes em modo assíncrono (#33497):
+# cada thread do sync_to_async manteria a sua conexão aberta até esgotar o
+# PostgreSQL. Sob ASGI, as conexões só são reaproveitadas pelo pool
+# (DB_POOL), que limita o total. CONN_MAX_AGE é lido a cada conexão, então
+# vale mesmo com as configurações já carregadas.
+for database in settings.DATABASES.values():
+    database['CONN_MAX_AGE'] = 0
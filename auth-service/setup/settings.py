@@ -26,7 +26,7 @@ SECRET_KEY = env('SECRET_KEY')
 
 DEBUG = env('DEBUG')
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = env.list('ALLOWED_HOSTS', default=[])
 
 AUTH_USER_MODEL = "core.User"
 
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -84,9 +85,82 @@ DATABASES = {
         'PASSWORD': env('POSTGRES_PASSWORD'),
         'HOST': env('POSTGRES_HOST'),
         'PORT': env('POSTGRES_PORT'),
+        # Conexões persistentes, verificadas antes de serem reaproveitadas
+        'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=60),
+        'CONN_HEALTH_CHECKS': env.bool('DB_CONN_HEALTH_CHECKS', default=True),
     }
 }
 
+# Pool de conexões do psycopg 3 (apenas PostgreSQL). O Django não combina o
+# pool com conexões persistentes, então CONN_MAX_AGE passa a ser 0 e as
+# verificações de saúde ficam a cargo do pool.
+if env.bool('DB_POOL', default=False):
+    from psycopg_pool import ConnectionPool
+
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+            'max_size': env.int('DB_POOL_MAX_SIZE', default=10),
+            'timeout': env.float('DB_POOL_TIMEOUT', default=10.0),
+            'max_idle': env.float('DB_POOL_MAX_IDLE', default=600.0),
+            'check': ConnectionPool.check_connection if DATABASES['default']['CONN_HEALTH_CHECKS'] else None,
+        },
+    }
+
+# Token exigido pelo endpoint /metrics (Authorization: Bearer <token>); vazio
+# deixa o endpoint aberto, para redes internas
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# O cache de usuários usa por padrão um LRU em memória do processo. Para
+# compartilhá-lo entre workers, aponte USER_CACHE_BACKEND para um backend
+# como django.core.cache.backends.redis.RedisCache.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'users': {
+        'BACKEND': env('USER_CACHE_BACKEND', default='core.cache.LRUCache'),
+        'LOCATION': env('USER_CACHE_LOCATION', default='users'),
+        'TIMEOUT': env.int('USER_CACHE_TIMEOUT', default=300),
+        'OPTIONS': env.json('USER_CACHE_OPTIONS', default={'MAX_ENTRIES': 10000}),
+    },
+    'token_versions': {
+        'BACKEND': 'core.cache.LRUCache',
+        'LOCATION': 'token_versions',
+        'TIMEOUT': env.int('TOKEN_VERSION_CACHE_TIMEOUT', default=30),
+        'OPTIONS': {'MAX_ENTRIES': env.int('TOKEN_VERSION_CACHE_MAX_ENTRIES', default=100000)},
+    },
+    'tokens': {
+        'BACKEND': 'core.cache.LRUCache',
+        'LOCATION': 'tokens',
+        'OPTIONS': {'MAX_ENTRIES': env.int('TOKEN_CACHE_MAX_ENTRIES', default=50000)},
+    },
+    # jti dos refresh tokens já trocados, cada um até a expiração do token.
+    # Com vários workers, o backend precisa ser compartilhado (ex.:
+    # DatabaseCache, após ``manage.py createcachetable``, ou Redis) para que
+    # o reuso seja detectado em qualquer processo; o gunicorn.conf.py não
+    # sobe workers com um cache local.
+    'refresh_tokens': {
+        'BACKEND': env('REFRESH_TOKEN_CACHE_BACKEND', default='core.cache.LRUCache'),
+        'LOCATION': env('REFRESH_TOKEN_CACHE_LOCATION', default='refresh_tokens'),
+        'OPTIONS': {'MAX_ENTRIES': env.int('REFRESH_TOKEN_CACHE_MAX_ENTRIES', default=200000)},
+    },
+}
+
+USER_CACHE_ALIAS = 'users'
+
+TOKEN_CACHE_ALIAS = 'tokens'
+
+TOKEN_VERSION_CACHE_ALIAS = 'token_versions'
+
+REFRESH_TOKEN_CACHE_ALIAS = 'refresh_tokens'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -106,22 +180,137 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Hashers de senha. O perfil escolhido em PASSWORD_HASHER_PROFILE gera os
+# novos hashes; os demais continuam aceitos e os hashes antigos são refeitos
+# com o perfil atual no próximo login bem-sucedido. O perfil 'argon2'
+# requer o pacote argon2-cffi.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'core.hashers.TunedPBKDF2PasswordHasher',
+    'scrypt': 'core.hashers.TunedScryptPasswordHasher',
+    'argon2': 'core.hashers.TunedArgon2PasswordHasher',
+}
+
+PASSWORD_HASHER_PROFILE = env('PASSWORD_HASHER_PROFILE', default='pbkdf2')
+
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE],
+    *(path for name, path in PASSWORD_HASHER_PROFILES.items() if name != PASSWORD_HASHER_PROFILE),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+PASSWORD_HASHER_PARAMS = {
+    'PBKDF2_ITERATIONS': env.int('PBKDF2_ITERATIONS', default=600000),
+    'SCRYPT_WORK_FACTOR': env.int('SCRYPT_WORK_FACTOR', default=2 ** 14),
+    'SCRYPT_BLOCK_SIZE': env.int('SCRYPT_BLOCK_SIZE', default=8),
+    'SCRYPT_PARALLELISM': env.int('SCRYPT_PARALLELISM', default=1),
+    'ARGON2_TIME_COST': env.int('ARGON2_TIME_COST', default=2),
+    'ARGON2_MEMORY_COST': env.int('ARGON2_MEMORY_COST', default=65536),
+    'ARGON2_PARALLELISM': env.int('ARGON2_PARALLELISM', default=2),
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Proxies confiáveis à frente da aplicação. Com 0 o IP do cliente é o
+    # REMOTE_ADDR e o X-Forwarded-For, que o cliente controla, é ignorado
+    'NUM_PROXIES': env.int('NUM_PROXIES', default=0),
 }
 
 SIMPLE_JWT = {
+    'ALGORITHM': env('JWT_ALGORITHM', default='HS256'),
+    'AUTH_TOKEN_CLASSES': ('api.tokens.AccessToken',),
+    'TOKEN_USER_CLASS': 'api.authentication.ClaimsUser',
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
-    'ROTATE_REFRESH_TOKENS': False,
+    # Cada refresh token vale uma troca; o reuso revoga os tokens do usuário
+    'ROTATE_REFRESH_TOKENS': env.bool('JWT_ROTATE_REFRESH_TOKENS', default=True),
     'BLACKLIST_AFTER_ROTATION': False,
     'USER_ID_FIELD': 'user_id',    
     'USER_ID_CLAIM': 'user_id',     
 }
 
+# Verificação adicional feita a cada requisição autenticada:
+#   'none'    - confia apenas nas claims do token (sem consulta ao banco)
+#   'version' - compara a claim 'ver' com o token_version do usuário, lido de
+#               um cache local com TTL de TOKEN_VERSION_CACHE_TIMEOUT segundos
+#   'db'      - confirma no banco que o usuário existe e está ativo
+JWT_REVOCATION_CHECK = env('JWT_REVOCATION_CHECK', default='version')
+
+# Chaves PEM para algoritmos assimétricos (RS256, EdDSA...). Ver api/keys.py
+JWT_SIGNING = {
+    'KEYS_DIR': BASE_DIR / env('JWT_KEYS_DIR', default='keys'),
+    'ACTIVE_KID': env('JWT_ACTIVE_KID', default=''),
+}
+
+# Tempo (s) que os consumidores podem cachear /.well-known/jwks.json
+JWKS_MAX_AGE = env.int('JWKS_MAX_AGE', default=86400)
+
+# Número máximo de tokens por requisição em /api/auth/introspect/
+TOKEN_INTROSPECTION_MAX_BATCH = env.int('TOKEN_INTROSPECTION_MAX_BATCH', default=100)
+
+# Credencial dos serviços que chamam /api/auth/introspect/ (Authorization:
+# Bearer <token>, RFC 7662 §2.1); vazio aceita apenas administradores
+TOKEN_INTROSPECTION_CLIENT_TOKEN = env('TOKEN_INTROSPECTION_CLIENT_TOKEN', default='')
+
+# Busca de usuários em lote (/api/auth/user/batch/)
+USER_BATCH_LOOKUP = {
+    # Total de IDs e e-mails aceitos por requisição
+    'MAX_ITEMS': env.int('USER_BATCH_MAX_ITEMS', default=500),
+    'QUERY_CHUNK_SIZE': env.int('USER_BATCH_QUERY_CHUNK_SIZE', default=500),
+}
+
+# Importação em lote (/api/auth/register/bulk/ e manage.py import_users)
+USER_IMPORT = {
+    'BATCH_SIZE': env.int('USER_IMPORT_BATCH_SIZE', default=1000),
+    'INSERT_CHUNK_SIZE': env.int('USER_IMPORT_INSERT_CHUNK_SIZE', default=500),
+    # 0 usa um worker de hashing por núcleo
+    'HASH_WORKERS': env.int('USER_IMPORT_HASH_WORKERS', default=0),
+}
+
+# Paginação por cursor e exportação em streaming da listagem de usuários
+USER_LIST_PAGINATION = {
+    'PAGE_SIZE': env.int('USER_LIST_PAGE_SIZE', default=100),
+    'MAX_PAGE_SIZE': env.int('USER_LIST_MAX_PAGE_SIZE', default=1000),
+    'STREAM_CHUNK_SIZE': env.int('USER_LIST_STREAM_CHUNK_SIZE', default=2000),
+}
+
+# Pool usado pelo login assíncrono para verificar senhas fora do event loop
+LOGIN_HASH_POOL = {
+    'EXECUTOR': env('LOGIN_HASH_POOL_EXECUTOR', default='thread'),
+    'MAX_WORKERS': env.int('LOGIN_HASH_POOL_MAX_WORKERS', default=4),
+    'MAX_QUEUE': env.int('LOGIN_HASH_POOL_MAX_QUEUE', default=32),
+    'RETRY_AFTER': env.int('LOGIN_HASH_POOL_RETRY_AFTER', default=1),
+}
+
+# Limite de falhas de login por IP e por e-mail em uma janela deslizante,
+# aplicado antes da verificação da senha. STORE 'memory' conta por processo;
+# 'cache' usa o cache CACHE_ALIAS (ex.: Redis) para compartilhar as contagens.
+LOGIN_RATE_LIMIT = {
+    'ENABLED': env.bool('LOGIN_RATE_LIMIT_ENABLED', default=True),
+    'STORE': env('LOGIN_RATE_LIMIT_STORE', default='memory'),
+    'CACHE_ALIAS': env('LOGIN_RATE_LIMIT_CACHE_ALIAS', default='default'),
+    'WINDOW': env.int('LOGIN_RATE_LIMIT_WINDOW', default=300),
+    'BUCKETS': env.int('LOGIN_RATE_LIMIT_BUCKETS', default=10),
+    'IP_LIMIT': env.int('LOGIN_RATE_LIMIT_IP', default=100),
+    'EMAIL_LIMIT': env.int('LOGIN_RATE_LIMIT_EMAIL', default=10),
+    'MAX_KEYS': env.int('LOGIN_RATE_LIMIT_MAX_KEYS', default=100000),
+}
+
+# Login com e-mail desconhecido. STRATEGY 'hash' verifica a senha contra um
+# hash fictício, 'sleep' só espera o custo estimado de uma verificação (até
+# MAX_DELAY segundos) e 'none' responde imediatamente. EMAIL_FILTER liga o
+# filtro de Bloom por processo que evita a consulta ao banco; cadastros de
+# outros processos só entram nele após FILTER_REBUILD_INTERVAL segundos.
+LOGIN_UNKNOWN_USER = {
+    'STRATEGY': env('LOGIN_UNKNOWN_USER_STRATEGY', default='sleep'),
+    'MAX_DELAY': env.float('LOGIN_UNKNOWN_USER_MAX_DELAY', default=1.0),
+    'EMAIL_FILTER': env.bool('LOGIN_EMAIL_FILTER', default=False),
+    'FILTER_ERROR_RATE': env.float('LOGIN_EMAIL_FILTER_ERROR_RATE', default=0.01),
+    'FILTER_REBUILD_INTERVAL': env.int('LOGIN_EMAIL_FILTER_REBUILD_INTERVAL', default=300),
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
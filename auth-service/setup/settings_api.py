@@ -0,0 +1,37 @@
+"""
+Perfil só de API (DJANGO_SETTINGS_MODULE=setup.settings_api).
+
+Serve apenas os endpoints stateless de ``setup.urls_api``, autenticados por
+bearer token, sem sessões, CSRF, mensagens nem o AuthenticationMiddleware,
+que não têm uso nessas rotas. O admin continua no perfil completo
+(``setup.settings``), implantado separadamente.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, REST_FRAMEWORK
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in (
+        'django.contrib.admin',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+        'django.contrib.staticfiles',
+    )
+]
+
+MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'setup.urls_api'
+
+TEMPLATES = []
+
+# Sem a API navegável, que depende de templates e arquivos estáticos
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ('rest_framework.renderers.JSONRenderer',),
+}
@@ -0,0 +1,35 @@
+"""
+Perfil da suíte de testes (padrão do pytest.ini).
+
+Usa SQLite em memória, um banco por processo, então a suíte roda em
+paralelo com ``pytest -n auto`` (pytest-xdist) sem disputar o mesmo banco.
+O PBKDF2 roda com uma iteração: os testes verificam qual hasher e quais
+parâmetros são usados, não o custo. Para rodar contra o banco de
+DATABASES (ex.: os planos de consulta no PostgreSQL), use
+``pytest --ds setup.settings``.
+"""
+
+import os
+
+# Valores só para carregar setup.settings sem um .env
+os.environ.setdefault('SECRET_KEY', 'insecure-test-secret-key')
+for name in ('DB_ENGINE', 'POSTGRES_DB', 'POSTGRES_USER', 'POSTGRES_PASSWORD', 'POSTGRES_HOST', 'POSTGRES_PORT'):
+    os.environ.setdefault(name, '')
+
+from .settings import *  # noqa: E402,F401,F403
+from .settings import PASSWORD_HASHER_PARAMS  # noqa: E402
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+PASSWORD_HASHER_PARAMS = {
+    **PASSWORD_HASHER_PARAMS,
+    'PBKDF2_ITERATIONS': 1,
+    'SCRYPT_WORK_FACTOR': 2 ** 4,
+    'ARGON2_TIME_COST': 1,
+    'ARGON2_MEMORY_COST': 64,
+}
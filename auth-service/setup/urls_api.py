@@ -0,0 +1,9 @@
+from django.urls import path, include
+from api.views import JWKSView
+from core.views import MetricsView
+
+urlpatterns = [
+    path('api/', include('api.urls')),
+    path('.well-known/jwks.json', JWKSView.as_view(), name='jwks'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
+]